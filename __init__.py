@@ -1,9 +1,15 @@
 import os
+import json
+import asyncio
+import hashlib
+import threading
+from email.utils import formatdate
 from aiohttp import web
 from server import PromptServer
 
 from .nodes import (
     ImageFromFolder,
+    TextFromFolder,
     PromptStack,
     Picker,
     Picker_x1,
@@ -21,13 +27,22 @@ from .nodes import (
     LoraTagModelOnly,
     BatchStepper,
     PresetManager,
+    PresetBatch,
     SaveImageWithText,
     LoadImageWithText,
-    IMAGE_EXTENSIONS,
+    _get_folder_index,
+    _read_texts,
+    _save_writer,
+    _preset_names_version,
+    _expand_preset_seeds,
+    PRESET_OUTPUTS,
+    MODEL_EXTENSIONS,
+    _model_inventory,
 )
 
 NODE_CLASS_MAPPINGS = {
     "ImageFromFolder_JN": ImageFromFolder,
+    "TextFromFolder_JN": TextFromFolder,
     "PromptStack_JN": PromptStack,
     "Picker_JN": Picker,
     "Picker_x1_JN": Picker_x1,
@@ -45,12 +60,14 @@ NODE_CLASS_MAPPINGS = {
     "LoraTagModelOnly_JN": LoraTagModelOnly,
     "BatchStepper_JN": BatchStepper,
     "PresetManager_JN": PresetManager,
+    "PresetBatch_JN": PresetBatch,
     "SaveImageWithText_JN": SaveImageWithText,
     "LoadImageWithText_JN": LoadImageWithText,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "ImageFromFolder_JN": "Image From Folder \U0001f48e Just Nodes",
+    "TextFromFolder_JN": "Text From Folder \U0001f48e Just Nodes",
     "PromptStack_JN": "Prompt Stack \U0001f48e Just Nodes",
     "Picker_JN": "Picker (dynamic) \U0001f48e Just Nodes",
     "Picker_x1_JN": "Picker x1 \U0001f48e Just Nodes",
@@ -68,6 +85,7 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "LoraTagModelOnly_JN": "LoRA Tag (Model Only) \U0001f48e Just Nodes",
     "BatchStepper_JN": "Batch Stepper \U0001f48e Just Nodes",
     "PresetManager_JN": "Preset Manager \U0001f48e Just Nodes",
+    "PresetBatch_JN": "Preset Batch \U0001f48e Just Nodes",
     "SaveImageWithText_JN": "Save Image With Text \U0001f48e Just Nodes",
     "LoadImageWithText_JN": "Load Image With Text \U0001f48e Just Nodes",
 }
@@ -75,45 +93,267 @@ NODE_DISPLAY_NAME_MAPPINGS = {
 WEB_DIRECTORY = "./js"
 
 
+# Distinguishes ETags across server restarts, where in-memory versions start over
+_ETAG_TOKEN = os.urandom(4).hex()
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get("If-None-Match", "")
+    return any(tag.strip() in (etag, "*", f"W/{etag}") for tag in header.split(","))
+
+
+def _cached_json(request, payload, etag, mtime=None):
+    """JSON response with ETag/Last-Modified, or 304 when the client is current."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if mtime is not None:
+        headers["Last-Modified"] = formatdate(mtime, usegmt=True)
+    if "If-None-Match" in request.headers:
+        if _etag_matches(request, etag):
+            return web.Response(status=304, headers=headers)
+    elif mtime is not None and request.if_modified_since is not None:
+        if int(mtime) <= request.if_modified_since.timestamp():
+            return web.Response(status=304, headers=headers)
+    return web.json_response(payload, headers=headers)
+
+
 @PromptServer.instance.routes.get("/just_nodes/reload_presets")
 async def reload_presets(request):
-    presets_file = os.path.join(os.path.dirname(__file__), "presets", "presets.json")
-    if not os.path.isfile(presets_file):
-        return web.json_response({"presets": [], "error": "presets.json not found"})
+    loop = asyncio.get_running_loop()
     try:
-        with open(presets_file, "r", encoding="utf-8") as f:
-            data = __import__("json").load(f)
-        return web.json_response({"presets": list(data.keys())})
+        # An explicit reload also rereads presets.d files edited in place
+        names, key = await loop.run_in_executor(None, _preset_names_version, True)
     except Exception as e:
         return web.json_response({"presets": [], "error": str(e)})
+    if not names:
+        return web.json_response({"presets": [], "error": "no presets found"})
+    etag = '"%s"' % hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    mtime = max(version[1] for _, version in key) / 1e9
+    return _cached_json(request, {"presets": names}, etag, mtime)
+
+
+MAX_EXPANSIONS = 1_000_000
+
+
+@PromptServer.instance.routes.post("/just_nodes/expand_preset")
+async def expand_preset(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return web.json_response({"error": "body must be JSON"}, status=400)
+    if not isinstance(data, dict):
+        return web.json_response({"error": "body must be a JSON object"}, status=400)
+    try:
+        if "seeds" in data:
+            if not isinstance(data["seeds"], list):
+                raise TypeError
+            seeds = [int(s) for s in data["seeds"]]
+        else:
+            start = int(data.get("seed_start", 0))
+            seeds = range(start, start + int(data.get("count", 1)))
+        preset_index = int(data.get("preset_index", -1))
+    except (TypeError, ValueError):
+        return web.json_response(
+            {"error": "seeds must be a list of integers; seed_start, count and preset_index integers"},
+            status=400)
+    if len(seeds) > MAX_EXPANSIONS:
+        return web.json_response({"error": f"at most {MAX_EXPANSIONS} seeds per request"}, status=400)
+
+    text_fields = ("preset", "prompt_template", "negative_template",
+                   "extra_text_override", "system_prompt_override")
+    if not all(isinstance(data.get(k, ""), str) for k in text_fields):
+        return web.json_response({"error": f"{', '.join(text_fields)} must be strings"}, status=400)
+
+    args = (
+        data.get("prompt_template", ""),
+        preset_index,
+        data.get("negative_template", ""),
+        data.get("extra_text_override", ""),
+        data.get("system_prompt_override", ""),
+    )
+    preset = data.get("preset", "")
+
+    def expand_chunk(chunk):
+        outputs, error = _expand_preset_seeds(preset, chunk, *args)
+        if error:
+            return None, error
+        lines = "".join(
+            json.dumps({"seed": seed, **dict(zip(PRESET_OUTPUTS, out))}, ensure_ascii=False) + "\n"
+            for seed, out in zip(chunk, outputs)
+        )
+        return lines.encode("utf-8"), None
+
+    loop = asyncio.get_running_loop()
+    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await resp.prepare(request)
+    for start in range(0, len(seeds), 2000):
+        body, error = await loop.run_in_executor(None, expand_chunk, seeds[start:start + 2000])
+        if error:
+            await resp.write((json.dumps({"error": error}) + "\n").encode("utf-8"))
+            break
+        await resp.write(body)
+    await resp.write_eof()
+    return resp
+
+
+def _text_roots():
+    """Folders whose contents folder_texts and scan_folder may list: ComfyUI's input,
+    output and temp directories, plus any in JUST_NODES_TEXT_ROOTS (os.pathsep-separated)."""
+    import folder_paths
+
+    roots = [
+        folder_paths.get_input_directory(),
+        folder_paths.get_output_directory(),
+        folder_paths.get_temp_directory(),
+    ]
+    roots += [r for r in os.environ.get("JUST_NODES_TEXT_ROOTS", "").split(os.pathsep) if r]
+    return [os.path.realpath(r) for r in roots]
+
+
+def _text_folder_allowed(folder):
+    real = os.path.realpath(folder)
+    for root in _text_roots():
+        try:
+            if os.path.commonpath([real, root]) == root:
+                return True
+        except ValueError:  # different drives
+            continue
+    return False
+
+
+def _outside_roots_response():
+    return web.json_response(
+        {"error": "folder is outside the input/output/temp directories "
+                  "(add it to JUST_NODES_TEXT_ROOTS to allow it)"},
+        status=403,
+    )
 
 
 @PromptServer.instance.routes.get("/just_nodes/scan_folder")
 async def scan_folder(request):
     folder = request.query.get("folder", "")
-    if not os.path.isdir(folder):
+    recursive = request.query.get("recursive", "") in ("1", "true")
+    sort = request.query.get("sort", "name")
+    try:
+        offset = max(0, int(request.query.get("offset", 0)))
+        limit = max(0, int(request.query.get("limit", 0)))
+    except ValueError:
+        return web.json_response({"error": "offset and limit must be integers"}, status=400)
+    # The count is fine for any folder, but file names only leave the allowed roots
+    if limit and not _text_folder_allowed(folder):
+        return _outside_roots_response()
+
+    def scan():
+        if not os.path.isdir(folder):
+            return None
+        index = _get_folder_index(folder, recursive, sort)
+        with index.lock:
+            return len(index.files), index.files[offset:offset + limit], index.version
+
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, scan)
+    if result is None:
         return web.json_response({"count": 0})
-    count = sum(
-        1 for f in os.listdir(folder)
-        if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS
-    )
-    return web.json_response({"count": count})
 
+    count, files, version = result
+    payload = {"count": count}
+    if limit:
+        # One page of the sorted listing, for browsing huge folders incrementally
+        payload.update({"offset": offset, "limit": limit, "files": files})
+    etag = f'"{_ETAG_TOKEN}-{version}-{offset}-{limit}"'
+    return _cached_json(request, payload, etag)
 
-MODEL_EXTENSIONS = {'.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.onnx', '.gguf'}
 
+@PromptServer.instance.routes.get("/just_nodes/folder_texts")
+async def folder_texts(request):
+    folder = request.query.get("folder", "")
+    recursive = request.query.get("recursive", "") in ("1", "true")
+    sort = request.query.get("sort", "name")
+    if not os.path.isdir(folder):
+        return web.json_response({"error": "folder not found"}, status=404)
+    if not _text_folder_allowed(folder):
+        return _outside_roots_response()
 
-@PromptServer.instance.routes.post("/just_nodes/check_models")
-async def check_models(request):
-    import nodes as comfy_nodes
+    loop = asyncio.get_running_loop()
+    index = await loop.run_in_executor(None, _get_folder_index, folder, recursive, sort)
+    files = list(index.files)
+
+    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await resp.prepare(request)
+    for start in range(0, len(files), 512):
+        chunk = files[start:start + 512]
+        paths = [os.path.join(index.folder, f) for f in chunk]
+        texts = await loop.run_in_executor(None, _read_texts, paths)
+        lines = "".join(
+            json.dumps({"file": f, "text": t}, ensure_ascii=False) + "\n"
+            for f, t in zip(chunk, texts)
+        )
+        await resp.write(lines.encode("utf-8"))
+    await resp.write_eof()
+    return resp
+
+
+@PromptServer.instance.routes.post("/just_nodes/flush_saves")
+async def flush_saves(request):
+    loop = asyncio.get_running_loop()
+    waited, errors = await loop.run_in_executor(None, _save_writer().flush)
+    return web.json_response({"waited": waited, "errors": errors})
+
+
+_MODEL_INPUTS = {}  # class_type -> [(input_name, frozenset of options)]
+_MODEL_INPUTS_TOKEN = [None]
+_MODEL_INPUTS_LOCK = threading.Lock()
+
+
+def _model_lists_token():
+    """Changes whenever one of ComfyUI's model file lists changes."""
+    import folder_paths
+
+    lists = []
+    for name, entry in sorted(folder_paths.folder_names_and_paths.items()):
+        extensions = entry[1]
+        if extensions and not MODEL_EXTENSIONS.isdisjoint(extensions):
+            lists.append((name, tuple(folder_paths.get_filename_list(name))))
+    return hash(tuple(lists))
+
+
+def _model_inputs(node_class):
+    """Inputs of a node class whose options look like model files."""
+    model_inputs = []
+    input_types = node_class.INPUT_TYPES()
+    for category in ("required", "optional"):
+        cat_inputs = input_types.get(category, {})
+        for input_name, input_config in cat_inputs.items():
+            if not isinstance(input_config, (tuple, list)) or len(input_config) == 0:
+                continue
+            options = input_config[0]
+            if not isinstance(options, (list, tuple)) or len(options) == 0:
+                continue
+
+            is_model = False
+            for item in list(options)[:10]:
+                if any(str(item).lower().endswith(ext) for ext in MODEL_EXTENSIONS):
+                    is_model = True
+                    break
+
+            if is_model:
+                model_inputs.append((input_name, frozenset(o for o in options if isinstance(o, str))))
+    return model_inputs
 
-    data = await request.json()
-    workflow_nodes = data.get("nodes", [])
+
+def _check_workflow(workflow_nodes, refresh=False):
+    import nodes as comfy_nodes
 
     found = []
     missing = []
     debug = []
 
+    # Model pickers are looked up once per class until the model lists change
+    token = _model_lists_token()
+    with _MODEL_INPUTS_LOCK:
+        if refresh or token != _MODEL_INPUTS_TOKEN[0]:
+            _MODEL_INPUTS.clear()
+            _MODEL_INPUTS_TOKEN[0] = token
+
     for node_info in workflow_nodes:
         class_type = node_info.get("type", "")
         widgets = node_info.get("widgets", {})
@@ -126,44 +366,51 @@ async def check_models(request):
                 debug.append(f"[{node_id}] {class_type}: class not in NODE_CLASS_MAPPINGS")
             continue
 
-        try:
-            input_types = node_class.INPUT_TYPES()
-        except Exception as e:
-            debug.append(f"[{node_id}] {class_type}: INPUT_TYPES error: {e}")
-            continue
+        with _MODEL_INPUTS_LOCK:
+            model_inputs = _MODEL_INPUTS.get(class_type)
+        if model_inputs is None:
+            try:
+                model_inputs = _model_inputs(node_class)
+            except Exception as e:
+                debug.append(f"[{node_id}] {class_type}: INPUT_TYPES error: {e}")
+                continue
+            with _MODEL_INPUTS_LOCK:
+                _MODEL_INPUTS[class_type] = model_inputs
+
+        for input_name, options in model_inputs:
+            value = widgets.get(input_name)
+            if not isinstance(value, str) or not value:
+                continue
+
+            entry = {
+                "node_id": node_id,
+                "title": title,
+                "input": input_name,
+                "model": value,
+            }
+
+            if value in options:
+                found.append(entry)
+            else:
+                missing.append(entry)
+
+    # Point each missing model at the closest existing file
+    inventory = _model_inventory()
+    inventory.refresh(token)
+    if missing and inventory.token is None and not inventory.entries:
+        debug.append("model inventory is still being built; suggestions will follow")
+    for entry in missing:
+        entry["suggestions"] = inventory.suggest(entry["model"])
+
+    return {"found": found, "missing": missing, "debug": debug}
+
+
+@PromptServer.instance.routes.post("/just_nodes/check_models")
+async def check_models(request):
+    data = await request.json()
+    workflow_nodes = data.get("nodes", [])
+    refresh = bool(data.get("refresh", False))
 
-        for category in ("required", "optional"):
-            cat_inputs = input_types.get(category, {})
-            for input_name, input_config in cat_inputs.items():
-                if not isinstance(input_config, (tuple, list)) or len(input_config) == 0:
-                    continue
-                options = input_config[0]
-                if not isinstance(options, (list, tuple)) or len(options) == 0:
-                    continue
-
-                is_model = False
-                for item in list(options)[:10]:
-                    if any(str(item).lower().endswith(ext) for ext in MODEL_EXTENSIONS):
-                        is_model = True
-                        break
-
-                if not is_model:
-                    continue
-
-                value = widgets.get(input_name)
-                if not isinstance(value, str) or not value:
-                    continue
-
-                entry = {
-                    "node_id": node_id,
-                    "title": title,
-                    "input": input_name,
-                    "model": value,
-                }
-
-                if value in options:
-                    found.append(entry)
-                else:
-                    missing.append(entry)
-
-    return web.json_response({"found": found, "missing": missing, "debug": debug})
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, _check_workflow, workflow_nodes, refresh)
+    return web.json_response(result)
@@ -0,0 +1,48 @@
+"""Template substitution cost: the old str.replace loop vs _render_template.
+
+Each case fills four fields (prompt, extra text, negative, system prompt) of a
+template with N placeholders from N variables, as PresetManager does per run.
+Run from the ComfyUI root so nodes.py can import folder_paths and comfy:
+
+    python custom_nodes/ComfyUI-Just-Nodes/bench/render_template.py
+"""
+import os
+import sys
+import timeit
+import importlib.util
+
+sys.path.insert(0, os.getcwd())
+spec = importlib.util.spec_from_file_location(
+    "just_nodes_nodes", os.path.join(os.path.dirname(__file__), "..", "nodes.py"))
+just_nodes = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(just_nodes)
+
+
+def old_render(fields, values):
+    """PresetManager's substitution before the compiled single pass."""
+    fields = list(fields)
+    for var_name, var_value in values.items():
+        placeholder = f"{{{var_name}}}"
+        fields = [field.replace(placeholder, var_value) for field in fields]
+    return fields
+
+
+def new_render(fields, values):
+    return [just_nodes._render_template(field, values) for field in fields]
+
+
+def main():
+    print(f"{'placeholders':>12} {'str.replace':>12} {'compiled':>12}  (us per run)")
+    for n in (10, 100, 500):
+        values = {f"VAR_{i}": f"value number {i}" for i in range(n)}
+        template = ", ".join(f"some words {{VAR_{i}}}" for i in range(n))
+        fields = [template, template, template, template]
+        assert old_render(fields, values) == new_render(fields, values)
+        number = max(1, 20000 // n)
+        old = min(timeit.repeat(lambda: old_render(fields, values), number=number, repeat=5))
+        new = min(timeit.repeat(lambda: new_render(fields, values), number=number, repeat=5))
+        print(f"{n:>12} {old / number * 1e6:>12.1f} {new / number * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Per-image cost of SaveImageWithText's tensor-to-uint8 conversion.
+
+Compares the old per-image loop (image[i].cpu().numpy() * 255, then astype)
+with _to_uint8 for batches of 1-64. Run from the ComfyUI root so nodes.py can
+import folder_paths and comfy:
+
+    python custom_nodes/ComfyUI-Just-Nodes/bench/to_uint8.py --device cuda
+"""
+import os
+import sys
+import time
+import argparse
+import importlib.util
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.getcwd())
+spec = importlib.util.spec_from_file_location(
+    "just_nodes_nodes", os.path.join(os.path.dirname(__file__), "..", "nodes.py"))
+just_nodes = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(just_nodes)
+
+
+def old_convert(images):
+    return [(images[i].cpu().numpy() * 255.0).astype(np.uint8) for i in range(images.shape[0])]
+
+
+def sync(device):
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+
+
+def per_image_ms(fn, images, repeat):
+    fn(images)  # warm-up (and the pinned buffer allocation)
+    sync(str(images.device))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(images)
+    sync(str(images.device))
+    return (time.perf_counter() - start) * 1000 / repeat / images.shape[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The pinned column measures the opt-in JUST_NODES_PINNED_SAVE_MB path
+    just_nodes._PINNED_SAVE_MB = 1 << 20
+    print(f"{args.size}x{args.size} RGB on {args.device}, ms per image")
+    print(f"{'batch':>5} {'old loop':>9} {'batch':>9} {'pinned':>9}")
+    for n in (1, 2, 4, 8, 16, 32, 64):
+        images = torch.rand(n, args.size, args.size, 3, device=args.device)
+        old = per_image_ms(old_convert, images, args.repeat)
+        new = per_image_ms(just_nodes._to_uint8, images, args.repeat)
+        pinned = per_image_ms(lambda x: just_nodes._to_uint8(x, reuse_pinned=True),
+                              images, args.repeat)
+        print(f"{n:>5} {old:>9.2f} {new:>9.2f} {pinned:>9.2f}")
+        del images
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,33 @@ import { api } from "../../scripts/api.js";
   }
 })();
 
+// --- SaveImageWithText: flush background saves when the queue drains ---
+(function () {
+  api.addEventListener("executing", async (event) => {
+    const detail = event.detail;
+    const nodeId =
+      typeof detail === "object" && detail !== null ? detail.node : detail;
+    if (nodeId != null) return;
+
+    const asyncSave = app.graph._nodes.some(
+      (n) =>
+        n.type === "SaveImageWithText_JN" &&
+        n.widgets?.find((w) => w.name === "async_save")?.value,
+    );
+    if (!asyncSave) return;
+
+    try {
+      const resp = await fetch("/just_nodes/flush_saves", { method: "POST" });
+      const data = await resp.json();
+      for (const err of data.errors || []) {
+        console.error("[SaveImageWithText] background save failed:", err);
+      }
+    } catch (e) {
+      console.error("[SaveImageWithText] flush failed:", e);
+    }
+  });
+})();
+
 app.registerExtension({
   name: "just_nodes",
 
@@ -96,10 +123,17 @@ app.registerExtension({
               this.setDirtyCanvas(true);
               return;
             }
+            const recursiveWidget = this.widgets.find(
+              (w) => w.name === "recursive",
+            );
+            const sortWidget = this.widgets.find((w) => w.name === "sort");
+            const params = new URLSearchParams({
+              folder: folderWidget.value,
+              recursive: recursiveWidget?.value ? "1" : "0",
+              sort: sortWidget?.value || "name",
+            });
             try {
-              const resp = await fetch(
-                `/just_nodes/scan_folder?folder=${encodeURIComponent(folderWidget.value)}`,
-              );
+              const resp = await fetch(`/just_nodes/scan_folder?${params}`);
               const data = await resp.json();
               scanWidget.name = `${data.count} images found`;
             } catch {
@@ -183,6 +217,9 @@ app.registerExtension({
                 report += "MISSING:\n";
                 for (const m of data.missing) {
                   report += `  [${m.node_id}] ${m.title}\n    ${m.input}: ${m.model}\n`;
+                  for (const s of m.suggestions || []) {
+                    report += `      -> ${s.model} (${s.reason}, ${s.category})\n`;
+                  }
                 }
               }
               if (fc > 0) {
@@ -229,8 +266,8 @@ app.registerExtension({
       };
     }
 
-    // --- PresetManager: reload presets button ---
-    if (nodeData.name === "PresetManager_JN") {
+    // --- PresetManager / PresetBatch: reload presets button ---
+    if (nodeData.name === "PresetManager_JN" || nodeData.name === "PresetBatch_JN") {
       const onNodeCreated = nodeType.prototype.onNodeCreated;
       nodeType.prototype.onNodeCreated = function () {
         onNodeCreated?.apply(this, arguments);
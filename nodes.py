@@ -1,7 +1,20 @@
 import os
 import re
 import json
+import time
+import zlib
+import bisect
+import struct
+import difflib
 import random
+import hashlib
+import functools
+import itertools
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 import numpy as np
 import torch
@@ -11,8 +24,607 @@ import comfy.sd
 import comfy.utils
 
 PRESETS_DIR = os.path.join(os.path.dirname(__file__), "presets")
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache")
 
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+MODEL_EXTENSIONS = {'.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.onnx', '.gguf'}
+
+
+def _env_int(name, default):
+    """Integer setting from the environment; a malformed value warns and falls
+    back to the default instead of stopping the node pack from loading."""
+    raw = os.environ.get(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        print(f"[Just Nodes] ignoring {name}={raw!r}: not an integer, using {default}")
+        return default
+
+
+def _natural_key(name):
+    """Sort key that orders embedded numbers numerically (img2 < img10)."""
+    parts = re.split(r"(\d+)", name.replace(os.sep, "/"))
+    return ([int(p) if p.isdigit() else p.lower() for p in parts], name)
+
+
+def _name_key(name):
+    return name.replace(os.sep, "/")
+
+
+# Index versions are drawn from one counter so they never repeat within a process
+_FOLDER_VERSIONS = itertools.count(1)
+
+
+class _FolderIndex:
+    """Sorted list of the images in a folder, kept in sync incrementally.
+
+    Every directory is remembered with its mtime/inode and listing; a refresh
+    only stats the directories and rescans the ones that changed, so looking up
+    an index is O(1) once the folder has been walked. A refresh that changes
+    anything swaps in a new `files` list rather than editing the old one, so
+    readers can take `index.files` once and index into it without the lock.
+    """
+
+    # Directory mtimes younger than this are not trusted: a file created in the
+    # same timestamp tick right after our scan would otherwise go unnoticed.
+    RACY_NS = 2_000_000_000
+    # Past this many changed entries a full re-sort beats per-entry insertion.
+    BULK_CHANGES = 64
+
+    def __init__(self, folder, recursive=False, sort="name"):
+        self.folder = folder
+        self.recursive = recursive
+        self.key = _natural_key if sort == "natural" else _name_key
+        self.dirs = {}  # rel dir -> (mtime_ns or None, inode, files, subdirs)
+        self.files = []  # relative paths, sorted by self.key; replaced, never mutated
+        self.keys = []  # self.key(f) for each entry of self.files
+        self.work = None  # (files, keys) being edited by the current refresh
+        self.version = 0
+        self.lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self):
+        return len(self.files)
+
+    def _sidecar(self):
+        digest = hashlib.sha1(f"{self.folder}|{self.recursive}".encode("utf-8")).hexdigest()
+        return os.path.join(CACHE_DIR, "folder_index", f"{digest}.json")
+
+    def _scan_dir(self, full):
+        files, subdirs = [], []
+        with os.scandir(full) as it:
+            for entry in it:
+                if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    files.append(entry.name)
+                elif self.recursive and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+        return files, subdirs
+
+    def _apply(self, rel, old, new):
+        old_set, new_set = set(old), set(new)
+        removed = old_set - new_set
+        added = new_set - old_set
+        if not removed and not added:
+            return False
+        removed = {os.path.join(rel, f) for f in removed}
+        added = {os.path.join(rel, f) for f in added}
+
+        if self.work is None:
+            self.work = (list(self.files), list(self.keys))
+        files, keys = self.work
+
+        if len(removed) + len(added) > self.BULK_CHANGES:
+            kept = [f for f in files if f not in removed] if removed else files
+            kept.extend(added)
+            kept.sort(key=self.key)
+            self.work = (kept, [self.key(f) for f in kept])
+            return True
+
+        # Parallel key list instead of bisect's key= (Python 3.10+)
+        for f in removed:
+            i = bisect.bisect_left(keys, self.key(f))
+            if i >= len(files) or files[i] != f:
+                i = files.index(f)
+            del files[i]
+            del keys[i]
+        for f in added:
+            k = self.key(f)
+            i = bisect.bisect_right(keys, k)
+            files.insert(i, f)
+            keys.insert(i, k)
+        return True
+
+    def _load_sidecar(self):
+        try:
+            with open(self._sidecar(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("folder") != self.folder or data.get("recursive") != self.recursive:
+            return
+        files = []
+        for rel, (mtime, ino, names, subdirs) in data.get("dirs", {}).items():
+            self.dirs[rel] = (mtime, ino, names, subdirs)
+            files.extend(os.path.join(rel, n) for n in names)
+        files.sort(key=self.key)
+        self.files = files
+        self.keys = [self.key(f) for f in files]
+
+    def _save_sidecar(self):
+        path = self._sidecar()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"folder": self.folder, "recursive": self.recursive,
+                           "dirs": self.dirs}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[ImageFromFolder] could not write index cache: {e}")
+
+    def refresh(self, persist=False):
+        with self.lock:
+            if not self.loaded:
+                if persist:
+                    self._load_sidecar()
+                self.loaded = True
+
+            changed = False
+            self.work = None
+            seen = set()
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                seen.add(rel)
+                full = os.path.join(self.folder, rel) if rel else self.folder
+                entry = self.dirs.get(rel)
+                try:
+                    st = os.stat(full)
+                    if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_ino:
+                        files, subdirs = self._scan_dir(full)
+                    else:
+                        files = None
+                except OSError:
+                    seen.discard(rel)
+                    continue
+                if files is not None:
+                    if self._apply(rel, entry[2] if entry else [], files):
+                        changed = True
+                    mtime = st.st_mtime_ns
+                    if time.time_ns() - mtime < self.RACY_NS:
+                        mtime = None
+                    entry = (mtime, st.st_ino, files, subdirs)
+                    self.dirs[rel] = entry
+                if self.recursive:
+                    stack.extend(os.path.join(rel, d) for d in entry[3])
+
+            for rel in [r for r in self.dirs if r not in seen]:
+                if self._apply(rel, self.dirs.pop(rel)[2], []):
+                    changed = True
+
+            if self.work is not None:
+                self.files, self.keys = self.work
+                self.work = None
+            if changed:
+                self.version = next(_FOLDER_VERSIONS)
+                if persist:
+                    self._save_sidecar()
+            return changed
+
+
+_FOLDER_INDEXES = OrderedDict()
+_FOLDER_INDEXES_LOCK = threading.Lock()
+_FOLDER_INDEXES_MAX = 8
+
+
+def _get_folder_index(folder, recursive=False, sort="name", persist=False):
+    """Return the up-to-date image index for a folder, creating it on first use."""
+    folder = os.path.abspath(folder)
+    key = (folder, bool(recursive), sort)
+    with _FOLDER_INDEXES_LOCK:
+        index = _FOLDER_INDEXES.get(key)
+        if index is None:
+            index = _FolderIndex(folder, bool(recursive), sort)
+            _FOLDER_INDEXES[key] = index
+            while len(_FOLDER_INDEXES) > _FOLDER_INDEXES_MAX:
+                _FOLDER_INDEXES.popitem(last=False)
+        else:
+            _FOLDER_INDEXES.move_to_end(key)
+    index.refresh(persist)
+    return index
+
+
+_DECODE_POOL = None
+_DECODE_POOL_LOCK = threading.Lock()
+
+
+def _decode_pool():
+    """Shared thread pool for image decoding (PIL releases the GIL while decoding)."""
+    global _DECODE_POOL
+    with _DECODE_POOL_LOCK:
+        if _DECODE_POOL is None:
+            _DECODE_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4),
+                                              thread_name_prefix="just_nodes_decode")
+    return _DECODE_POOL
+
+
+class _DiskArrayCache:
+    """Decoded images stored as memory-mappable .npy files, LRU-evicted by size.
+
+    Entries are keyed by source path, size, mtime and decode variant, so an
+    edited file simply misses. Hits touch the .npy mtime, which orders eviction.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.size = None
+        self.lock = threading.Lock()
+
+    def key(self, path, variant):
+        """Entry key for the file as it is now. Take it once, before decoding,
+        and pass it to both load() and store(): re-stating after the decode
+        would file a replaced image's old pixels under the new version."""
+        st = os.stat(path)
+        raw = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{variant}"
+        return os.path.join(self.root, hashlib.sha1(raw.encode("utf-8")).hexdigest())
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.name.endswith(".npy"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path[:-4]))
+        return entries
+
+    def load(self, base):
+        """Return (read-only mmap array, text), or None on a miss."""
+        try:
+            arr = np.load(base + ".npy", mmap_mode="r")
+            with open(base + ".json", "r", encoding="utf-8") as f:
+                text = json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(base + ".npy")
+        except OSError:
+            pass
+        return arr, text
+
+    def store(self, base, path, arr, text):
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(base + ".json", "w", encoding="utf-8") as f:
+                json.dump({"path": path, "text": text}, f)
+            # The .npy appears last and atomically: its presence marks a complete entry
+            tmp = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+            np.save(tmp, arr)
+            os.replace(tmp, base + ".npy")
+        except OSError as e:
+            print(f"[Just Nodes] could not write decode cache: {e}")
+            return
+        with self.lock:
+            if self.size is None:
+                self.size = sum(size for _, size, _ in self._entries())
+            else:
+                self.size += arr.nbytes
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        self.size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 9 // 10
+        for _, size, base in entries:
+            if self.size <= target:
+                break
+            for ext in (".npy", ".json"):
+                try:
+                    os.remove(base + ext)
+                except OSError:
+                    pass
+            self.size -= size
+
+
+_DISK_CACHE = _DiskArrayCache(os.path.join(CACHE_DIR, "decoded"), 8 << 30)
+
+
+def _read_image(path, disk_cache=False, alpha=False):
+    """Decode an image file to a uint8 array plus its embedded just_text.
+
+    The array is RGB, or RGBA when alpha is set and the image has an alpha band.
+    """
+    variant = "exif-rgba" if alpha else "exif-rgb"
+    if disk_cache:
+        cache_key = _DISK_CACHE.key(path, variant)
+        hit = _DISK_CACHE.load(cache_key)
+        if hit is not None:
+            return hit
+
+    img = Image.open(path)
+    img = ImageOps.exif_transpose(img)
+
+    # Extract text from PNG metadata
+    text = ""
+    if hasattr(img, "info") and "just_text" in img.info:
+        text = img.info["just_text"]
+
+    mode = "RGBA" if alpha and "A" in img.getbands() else "RGB"
+    arr = np.array(img.convert(mode))
+    if disk_cache:
+        _DISK_CACHE.store(cache_key, path, arr, text)
+    return arr, text
+
+
+def _png_text(path, key):
+    """Read one text chunk from a PNG by walking its chunk list, skipping IDAT."""
+    key = key.encode("latin-1")
+    with open(path, "rb") as f:
+        if f.read(8) != b"\x89PNG\r\n\x1a\n":
+            return ""
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                return ""
+            length, ctype = struct.unpack(">I4s", head)
+            if ctype == b"IEND":
+                return ""
+            if ctype not in (b"tEXt", b"zTXt", b"iTXt"):
+                f.seek(length + 4, os.SEEK_CUR)
+                continue
+            data = f.read(length)
+            f.seek(4, os.SEEK_CUR)
+            name, _, value = data.partition(b"\0")
+            if name != key:
+                continue
+            if ctype == b"tEXt":
+                return value.decode("latin-1")
+            if ctype == b"zTXt":
+                return zlib.decompress(value[1:]).decode("latin-1")
+            # iTXt: compression flag, method, language tag, translated keyword, text
+            compressed = value[0]
+            _, _, value = value[2:].partition(b"\0")
+            _, _, value = value.partition(b"\0")
+            if compressed:
+                value = zlib.decompress(value)
+            return value.decode("utf-8")
+
+
+MANIFEST_NAME = "just_nodes_manifest.jsonl"
+
+_MANIFEST_TEXTS = {}  # manifest path -> [inode, bytes parsed, {filename: text}]
+_MANIFEST_RECORDS = OrderedDict()  # (folder, record type, hash) already written by this process
+_MANIFEST_RECORDS_MAX = 1024
+_MANIFEST_LOCK = threading.Lock()
+
+# UI workflow fields that change without changing the graph (widget values, layout, view)
+_WORKFLOW_VOLATILE = ("widgets_values", "pos", "size", "flags", "color", "bgcolor")
+
+
+def _workflow_hash(workflow):
+    """Hash of a UI workflow's graph (nodes and links) without widget values or
+    layout, so queues that only change seeds or prompts share one record."""
+    if not isinstance(workflow, dict):
+        return None
+    nodes = [{k: v for k, v in node.items() if k not in _WORKFLOW_VOLATILE}
+             for node in workflow.get("nodes", []) if isinstance(node, dict)]
+    graph = {"nodes": nodes, "links": workflow.get("links", [])}
+    return hashlib.sha1(json.dumps(graph, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _manifest_record_new(folder, kind, digest):
+    """True the first time this process records (kind, digest) for a folder."""
+    key = (folder, kind, digest)
+    with _MANIFEST_LOCK:
+        if key in _MANIFEST_RECORDS:
+            _MANIFEST_RECORDS.move_to_end(key)
+            return False
+        _MANIFEST_RECORDS[key] = True
+        while len(_MANIFEST_RECORDS) > _MANIFEST_RECORDS_MAX:
+            _MANIFEST_RECORDS.popitem(last=False)
+        return True
+
+
+def _manifest_text(folder, filename):
+    """Look up a file's text in the folder's manifest, parsing only new lines."""
+    manifest = os.path.join(folder, MANIFEST_NAME)
+    try:
+        st = os.stat(manifest)
+    except OSError:
+        return None
+    with _MANIFEST_LOCK:
+        entry = _MANIFEST_TEXTS.get(manifest)
+        if entry is None or entry[0] != st.st_ino or entry[1] > st.st_size:
+            entry = [st.st_ino, 0, {}]
+            _MANIFEST_TEXTS[manifest] = entry
+        if entry[1] < st.st_size:
+            with open(manifest, "rb") as f:
+                f.seek(entry[1])
+                data = f.read(st.st_size - entry[1])
+            # Leave a partially written last line for the next call
+            end = data.rfind(b"\n") + 1
+            entry[1] += end
+            for line in data[:end].splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("type") == "image":
+                    entry[2][record.get("file")] = record.get("text", "")
+        return entry[2].get(filename)
+
+
+def _append_manifest(folder, lines):
+    """Append pre-serialized JSON lines to the folder's manifest in one write."""
+    data = "".join(line + "\n" for line in lines).encode("utf-8")
+    with _MANIFEST_LOCK:
+        # Unbuffered append: one write() per batch keeps concurrent writers' lines intact
+        with open(os.path.join(folder, MANIFEST_NAME), "ab", buffering=0) as f:
+            f.write(data)
+
+
+def _read_just_text(path):
+    """Return an image's just_text without decoding pixels.
+
+    PNGs carry it as a text chunk; jpg/webp use the companion .txt file, or
+    the folder manifest when SaveImageWithText wrote one instead.
+    """
+    try:
+        if os.path.splitext(path)[1].lower() == ".png":
+            return _png_text(path, "just_text")
+        try:
+            with open(os.path.splitext(path)[0] + ".txt", "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            folder, filename = os.path.split(path)
+            return _manifest_text(folder, filename) or ""
+    except (OSError, ValueError, zlib.error):
+        return ""
+
+
+def _read_texts(paths):
+    return list(_decode_pool().map(_read_just_text, paths))
+
+
+def _fit_image(arr, size, mode):
+    """Resize an RGB uint8 array to size (w, h), letterboxed or stretched."""
+    if arr.shape[1] == size[0] and arr.shape[0] == size[1]:
+        return arr
+    img = Image.fromarray(arr)
+    if mode == "letterbox":
+        img = ImageOps.pad(img, size, method=Image.LANCZOS, color=(0, 0, 0))
+    else:
+        img = img.resize(size, Image.LANCZOS)
+    return np.array(img)
+
+
+class _StampedCache:
+    """Byte-budgeted LRU of values loaded from files, validated against file
+    mtime/size.
+
+    Subclasses implement _load_value(path, *args) -> (value, nbytes). prefetch()
+    loads upcoming files on pool() so a later get() finds them ready (or waits
+    on the load already in flight instead of reading the file twice).
+    on_evict(path) is called, outside the lock, for every entry that leaves.
+    """
+
+    def __init__(self, max_bytes, pool, on_evict=None):
+        self.max_bytes = max_bytes
+        self.pool = pool
+        self.on_evict = on_evict
+        self.entries = OrderedDict()  # path -> (stamp, value, nbytes)
+        self.pending = {}  # path -> Future
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _load_value(self, path, *args):
+        raise NotImplementedError
+
+    @staticmethod
+    def _stamp(path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _put(self, path, stamp, value, nbytes):
+        """Insert an entry; return the paths whose old entries were dropped."""
+        dropped = []
+        old = self.entries.pop(path, None)
+        if old is not None:
+            self.size -= old[2]
+            dropped.append(path)
+        if nbytes <= self.max_bytes:
+            self.entries[path] = (stamp, value, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                evicted, (_, _, evicted_bytes) = self.entries.popitem(last=False)
+                self.size -= evicted_bytes
+                dropped.append(evicted)
+        return dropped
+
+    def _read(self, path, stamp, *args):
+        value, nbytes = self._load_value(path, *args)
+        with self.lock:
+            dropped = self._put(path, stamp, value, nbytes)
+        if self.on_evict is not None:
+            for dropped_path in dropped:
+                self.on_evict(dropped_path)
+        return stamp, value
+
+    def _load(self, path, *args):
+        try:
+            return self._read(path, self._stamp(path), *args)
+        finally:
+            with self.lock:
+                self.pending.pop(path, None)
+
+    def contains(self, path, stamp):
+        with self.lock:
+            entry = self.entries.get(path)
+            return entry is not None and entry[0] == stamp
+
+    def get(self, path, *args):
+        stamp = self._stamp(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            future = self.pending.get(path)
+
+        if future is not None:
+            if future.cancel():
+                # Not started yet: load here rather than wait behind the queue
+                # (get() itself may be running on a pool thread).
+                with self.lock:
+                    self.pending.pop(path, None)
+            else:
+                try:
+                    got_stamp, value = future.result()
+                    if got_stamp == stamp:
+                        return value
+                except Exception:
+                    pass
+
+        return self._read(path, stamp, *args)[1]
+
+    def prefetch(self, paths, *args, max_pending=16):
+        """Queue loads for `paths`, keeping at most `max_pending` in flight so
+        read-ahead doesn't crowd other users out of the pool."""
+        pool = self.pool()
+        with self.lock:
+            for path in paths:
+                if len(self.pending) >= max_pending:
+                    break
+                # Stale entries are left to get(), which rechecks mtime/size
+                if path in self.entries or path in self.pending:
+                    continue
+                self.pending[path] = pool.submit(self._load, path, *args)
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.size,
+                    "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+class _DecodedImageCache(_StampedCache):
+    """Decoded images as (array, just_text), prefetched on the decode pool."""
+
+    def __init__(self, max_bytes):
+        super().__init__(max_bytes, _decode_pool)
+
+    def _load_value(self, path, disk_cache=False):
+        arr, text = _read_image(path, disk_cache)
+        return (arr, text), arr.nbytes
+
+
+_IMAGE_CACHE = _DecodedImageCache(1 << 30)
 
 
 class ImageFromFolder:
@@ -24,42 +636,109 @@ class ImageFromFolder:
                 "index": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF,
                                    "control_after_generate": True}),
             },
+            "optional": {
+                "recursive": ("BOOLEAN", {"default": False}),
+                "sort": (["name", "natural"],),
+                "cache_index": ("BOOLEAN", {"default": False}),
+                "batch_size": ("INT", {"default": 1, "min": 1, "max": 4096}),
+                "batch_resize": (["letterbox", "stretch", "none"],),
+                "prefetch": ("INT", {"default": 0, "min": 0, "max": 64}),
+                "disk_cache": ("BOOLEAN", {"default": False}),
+            },
         }
 
-    RETURN_TYPES = ("IMAGE", "STRING",)
-    RETURN_NAMES = ("image", "text",)
+    RETURN_TYPES = ("IMAGE", "STRING", "STRING",)
+    RETURN_NAMES = ("image", "text", "texts",)
+    OUTPUT_IS_LIST = (False, False, True,)
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, folder, index):
+    def execute(self, folder, index, recursive=False, sort="name", cache_index=False,
+                batch_size=1, batch_resize="letterbox", prefetch=0, disk_cache=False):
         if not os.path.isdir(folder):
             raise FileNotFoundError(f"Folder not found: '{folder}'")
 
-        files = sorted(
-            f for f in os.listdir(folder)
-            if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS
-        )
+        folder_index = _get_folder_index(folder, recursive, sort, cache_index)
+        # One snapshot for the whole run: a concurrent refresh swaps in a new list
+        files = folder_index.files
 
         if not files:
             raise FileNotFoundError(f"No images in: '{folder}'")
 
         if index >= len(files):
             raise IndexError(f"No more images: index {index} but only {len(files)} images in folder")
-        path = os.path.join(folder, files[index])
+        end = min(index + batch_size, len(files))
+        paths = [os.path.join(folder_index.folder, files[i]) for i in range(index, end)]
+
+        if prefetch:
+            load = lambda p: _IMAGE_CACHE.get(p, disk_cache)
+        else:
+            load = lambda p: _read_image(p, disk_cache)
+        if len(paths) == 1:
+            decoded = [load(paths[0])]
+        else:
+            decoded = list(_decode_pool().map(load, paths))
+
+        arrays = [arr for arr, _ in decoded]
+
+        # Decode the next runs' images while the GPU works on this one, but only
+        # as many as fit in half the cache alongside the current batch.
+        if prefetch:
+            per_image = max(1, sum(arr.nbytes for arr in arrays) // len(arrays))
+            fits = _IMAGE_CACHE.max_bytes // 2 // per_image
+            ahead = min(end + min(prefetch * len(paths), fits), len(files))
+            _IMAGE_CACHE.prefetch([os.path.join(folder_index.folder, files[i])
+                                   for i in range(end, ahead)], disk_cache)
+        texts = [text for _, text in decoded]
 
-        img = Image.open(path)
-        img = ImageOps.exif_transpose(img)
+        # Batch members must share one size: fit everything to the first image
+        h, w = arrays[0].shape[:2]
+        if any(arr.shape[:2] != (h, w) for arr in arrays):
+            if batch_resize == "none":
+                raise ValueError(f"Images in batch differ in size (first is {w}x{h}); "
+                                 f"set batch_resize to letterbox or stretch")
+            arrays = list(_decode_pool().map(
+                lambda arr: _fit_image(arr, (w, h), batch_resize), arrays))
 
-        # Extract text from PNG metadata
-        text = ""
-        if hasattr(img, "info") and "just_text" in img.info:
-            text = img.info["just_text"]
+        image = torch.from_numpy(np.stack(arrays)).to(torch.float32).div_(255.0)
 
-        img = img.convert("RGB")
-        image = np.array(img).astype(np.float32) / 255.0
-        image = torch.from_numpy(image)[None,]
+        return (image, texts[0], texts,)
 
-        return (image, text,)
+
+class TextFromFolder:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "folder": ("STRING", {"default": ""}),
+                "index": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF,
+                                   "control_after_generate": True}),
+            },
+            "optional": {
+                "recursive": ("BOOLEAN", {"default": False}),
+                "sort": (["name", "natural"],),
+            },
+        }
+
+    RETURN_TYPES = ("STRING", "STRING",)
+    RETURN_NAMES = ("text", "filename",)
+    FUNCTION = "execute"
+    CATEGORY = "\U0001f48e Just Nodes"
+
+    def execute(self, folder, index, recursive=False, sort="name"):
+        if not os.path.isdir(folder):
+            raise FileNotFoundError(f"Folder not found: '{folder}'")
+
+        folder_index = _get_folder_index(folder, recursive, sort)
+        files = folder_index.files
+
+        if not files:
+            raise FileNotFoundError(f"No images in: '{folder}'")
+
+        if index >= len(files):
+            raise IndexError(f"No more images: index {index} but only {len(files)} images in folder")
+
+        return (_read_just_text(os.path.join(folder_index.folder, files[index])), files[index],)
 
 
 class PromptStack:
@@ -80,17 +759,137 @@ class PromptStack:
         return ("\n".join(lines),)
 
 
+# Anchored so each line is tried once: unanchored, finditer would retry (and
+# backtrack through) every position of a long whitespace-only line.
+_NONEMPTY_LINE = re.compile(r"^.*\S.*$", re.M)
+_WEIGHT_PREFIX = re.compile(r"\s*(\d+(?:\.\d*)?|\.\d+)::[ \t]*")
+
+
+class _LineIndex:
+    """Start/end offsets of the non-empty lines of a text, so a pick is one slice
+    instead of splitting the whole text again."""
+
+    def __init__(self, text):
+        self.text = text
+        self.starts = array("q")
+        self.ends = array("q")
+        for m in _NONEMPTY_LINE.finditer(text):
+            self.starts.append(m.start())
+            self.ends.append(m.end())
+        self.bodies = None  # line starts past any `weight::` prefix
+        self.weights = None
+        self.prob = None  # Walker alias table, built on first weighted pick
+        self.alias = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def _parse_weights(self):
+        bodies = array("q")
+        weights = array("d")
+        for start, end in zip(self.starts, self.ends):
+            m = _WEIGHT_PREFIX.match(self.text, start, end)
+            if m:
+                bodies.append(m.end())
+                weights.append(float(m.group(1)))
+            else:
+                bodies.append(start)
+                weights.append(1.0)
+        self.weights = weights
+        self.bodies = bodies
+
+    def body(self, i):
+        """Line i without its `weight::` prefix."""
+        if self.bodies is None:
+            self._parse_weights()
+        return self.text[self.bodies[i]:self.ends[i]]
+
+    def _build_alias(self):
+        if self.weights is None:
+            self._parse_weights()
+        n = len(self.weights)
+        total = sum(self.weights)
+        if total > 0:
+            prob = array("d", (w * n / total for w in self.weights))
+        else:
+            prob = array("d", [1.0]) * n
+        alias = array("q", range(n))
+        small = [i for i, p in enumerate(prob) if p < 1.0]
+        large = [i for i, p in enumerate(prob) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            alias[s] = l
+            prob[l] += prob[s] - 1.0
+            (small if prob[l] < 1.0 else large).append(l)
+        for i in small + large:
+            prob[i] = 1.0
+        self.alias = alias
+        self.prob = prob
+
+    def sample(self, seed):
+        """Line index drawn in proportion to the line weights, O(1) per pick."""
+        if self.prob is None:
+            self._build_alias()
+        rng = random.Random(seed)
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+def _permute(i, n, key):
+    """Position i of a pseudo-random permutation of range(n) chosen by `key`:
+    a 4-round Feistel network over the next even power of two, cycle-walked
+    back into range, so the permutation is never materialized."""
+    if n <= 1:
+        return 0
+    half = ((n - 1).bit_length() + 1) // 2
+    mask = (1 << half) - 1
+    x = i
+    while True:
+        left, right = x >> half, x & mask
+        for r in range(4):
+            digest = hashlib.blake2b(f"{key}:{r}:{right}".encode(), digest_size=8).digest()
+            left, right = right, left ^ (int.from_bytes(digest, "little") & mask)
+        x = (left << half) | right
+        if x < n:
+            return x
+
+
+_LINE_INDEXES = OrderedDict()  # text -> _LineIndex
+_LINE_INDEXES_LOCK = threading.Lock()
+_LINE_INDEXES_SIZE = 16
+
+
+def _line_index(text):
+    """Cached line index for a Picker input, shared by all Picker variants."""
+    with _LINE_INDEXES_LOCK:
+        index = _LINE_INDEXES.get(text)
+        if index is not None:
+            _LINE_INDEXES.move_to_end(text)
+            return index
+    index = _LineIndex(text)
+    with _LINE_INDEXES_LOCK:
+        _LINE_INDEXES[text] = index
+        while len(_LINE_INDEXES) > _LINE_INDEXES_SIZE:
+            _LINE_INDEXES.popitem(last=False)
+    return index
+
+
 class Picker:
     @classmethod
     def INPUT_TYPES(cls):
         inputs = {
             "required": {
                 "select": ("INT", {"default": 0, "min": 0, "max": 19}),
-                "mode": (["manual", "random"],),
+                "mode": (["manual", "random", "weighted", "no-repeat"],),
                 "line": ("INT", {"default": 0, "min": 0}),
                 "seed": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF}),
             },
-            "optional": {},
+            "optional": {
+                "batch": ("INT", {"default": 1, "min": 0, "max": 4096}),
+            },
         }
         for i in range(1, 21):
             inputs["optional"][f"text_{i}"] = ("STRING", {"forceInput": True})
@@ -100,51 +899,47 @@ class Picker:
     def VALIDATE_INPUTS(cls, **kwargs):
         return True
 
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("text", "lines")
+    OUTPUT_IS_LIST = (False, True)
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, select, mode, line, seed, **kwargs):
-        connected = []
-        for i in range(1, 21):
-            key = f"text_{i}"
-            if key in kwargs and kwargs[key] is not None:
-                connected.append(kwargs[key])
-
-        if not connected:
-            return ("",)
-
-        slot = max(0, min(select, len(connected) - 1))
-        text = connected[slot]
-        lines = [ln for ln in text.split("\n") if ln.strip()]
-
-        if not lines:
-            return ("",)
-
-        if mode == "random":
-            pick = seed % len(lines)
-        else:
-            pick = max(0, min(line, len(lines) - 1))
-
-        return (lines[pick],)
+    def execute(self, select, mode, line, seed, batch=1, **kwargs):
+        return _picker_execute(select, mode, line, seed, 20, batch, **kwargs)
 
 
 def _picker_inputs(count):
     inputs = {
         "required": {
             "select": ("INT", {"default": 0, "min": 0, "max": count - 1}),
-            "mode": (["manual", "random"],),
+            "mode": (["manual", "random", "weighted", "no-repeat"],),
             "line": ("INT", {"default": 0, "min": 0}),
             "seed": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF}),
         },
-        "optional": {},
+        "optional": {
+            "batch": ("INT", {"default": 1, "min": 0, "max": 4096}),
+        },
     }
     for i in range(1, count + 1):
         inputs["optional"][f"text_{i}"] = ("STRING", {"forceInput": True})
     return inputs
 
 
-def _picker_execute(select, mode, line, seed, count, **kwargs):
+def _picker_pick(lines, mode, seed):
+    n = len(lines)
+    if mode == "weighted":
+        return lines.sample(seed)
+    if mode == "no-repeat":
+        # Each run of n consecutive seeds walks one permutation of the lines.
+        return _permute(seed % n, n, seed // n)
+    return seed % n
+
+
+def _picker_execute(select, mode, line, seed, count, batch=1, **kwargs):
+    """Pick for `seed` (or `line`) as `text`, plus `batch` picks as the `lines`
+    list: seeds seed..seed+batch-1, or consecutive lines from `line` in manual
+    mode. batch 0 lists every line in order."""
     connected = []
     for i in range(1, count + 1):
         key = f"text_{i}"
@@ -152,21 +947,27 @@ def _picker_execute(select, mode, line, seed, count, **kwargs):
             connected.append(kwargs[key])
 
     if not connected:
-        return ("",)
+        return ("", [""])
 
     slot = max(0, min(select, len(connected) - 1))
-    text = connected[slot]
-    lines = [ln for ln in text.split("\n") if ln.strip()]
+    lines = _line_index(connected[slot])
+    n = len(lines)
 
-    if not lines:
-        return ("",)
+    if not n:
+        return ("", [""])
 
-    if mode == "random":
-        pick = seed % len(lines)
+    if mode == "manual":
+        pick = max(0, min(line, n - 1))
+        picks = [(pick + k) % n for k in range(batch)]
     else:
-        pick = max(0, min(line, len(lines) - 1))
+        pick = _picker_pick(lines, mode, seed)
+        picks = [_picker_pick(lines, mode, seed + k) for k in range(batch)]
+    if batch == 0:
+        picks = range(n)
 
-    return (lines[pick],)
+    # `weight::` prefixes are only syntax in the modes that use them.
+    get = lines.body if mode in ("weighted", "no-repeat") else lines.line
+    return (get(pick), [get(i) for i in picks])
 
 
 class Picker_x1:
@@ -178,12 +979,14 @@ class Picker_x1:
     def VALIDATE_INPUTS(cls, **kwargs):
         return True
 
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("text", "lines")
+    OUTPUT_IS_LIST = (False, True)
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, select, mode, line, seed, **kwargs):
-        return _picker_execute(select, mode, line, seed, 1, **kwargs)
+    def execute(self, select, mode, line, seed, batch=1, **kwargs):
+        return _picker_execute(select, mode, line, seed, 1, batch, **kwargs)
 
 
 class Picker_x3:
@@ -195,12 +998,14 @@ class Picker_x3:
     def VALIDATE_INPUTS(cls, **kwargs):
         return True
 
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("text", "lines")
+    OUTPUT_IS_LIST = (False, True)
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, select, mode, line, seed, **kwargs):
-        return _picker_execute(select, mode, line, seed, 3, **kwargs)
+    def execute(self, select, mode, line, seed, batch=1, **kwargs):
+        return _picker_execute(select, mode, line, seed, 3, batch, **kwargs)
 
 
 class Picker_x6:
@@ -212,12 +1017,14 @@ class Picker_x6:
     def VALIDATE_INPUTS(cls, **kwargs):
         return True
 
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("text", "lines")
+    OUTPUT_IS_LIST = (False, True)
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, select, mode, line, seed, **kwargs):
-        return _picker_execute(select, mode, line, seed, 6, **kwargs)
+    def execute(self, select, mode, line, seed, batch=1, **kwargs):
+        return _picker_execute(select, mode, line, seed, 6, batch, **kwargs)
 
 
 class Picker_x9:
@@ -229,12 +1036,14 @@ class Picker_x9:
     def VALIDATE_INPUTS(cls, **kwargs):
         return True
 
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("text", "lines")
+    OUTPUT_IS_LIST = (False, True)
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, select, mode, line, seed, **kwargs):
-        return _picker_execute(select, mode, line, seed, 9, **kwargs)
+    def execute(self, select, mode, line, seed, batch=1, **kwargs):
+        return _picker_execute(select, mode, line, seed, 9, batch, **kwargs)
 
 
 class Picker_x12:
@@ -246,12 +1055,14 @@ class Picker_x12:
     def VALIDATE_INPUTS(cls, **kwargs):
         return True
 
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("text", "lines")
+    OUTPUT_IS_LIST = (False, True)
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, select, mode, line, seed, **kwargs):
-        return _picker_execute(select, mode, line, seed, 12, **kwargs)
+    def execute(self, select, mode, line, seed, batch=1, **kwargs):
+        return _picker_execute(select, mode, line, seed, 12, batch, **kwargs)
 
 
 def _search_replace_execute(text, count, **kwargs):
@@ -388,6 +1199,181 @@ class LabeledIndex:
         return (value,)
 
 
+def _partial_hash(path, size, block=1 << 20):
+    """SHA-256 over the size and the first and last MiB: cheap, and enough to
+    recognize the same model file under another name."""
+    m = hashlib.sha256(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        m.update(f.read(block))
+        if size > 2 * block:
+            f.seek(-block, os.SEEK_END)
+            m.update(f.read(block))
+    return m.hexdigest()
+
+
+class _ModelInventory:
+    """Every model file in ComfyUI's model folders, with size, mtime and partial hash.
+
+    Built on a background thread and persisted under cache/, so a rebuild
+    only stats files and hashes new or changed ones. Hashes of files that
+    disappear are remembered by name, which lets a renamed file be found.
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.entries = {}  # "category|relpath" -> [size, mtime_ns, hash]
+        self.known_hashes = {}  # relpath -> hash, including files since removed
+        self.by_basename = {}  # lowercase basename -> [(category, relpath)]
+        self.by_hash = {}  # hash -> [(category, relpath)]
+        self.by_stem = {}  # lowercase basename without extension -> [basename]
+        self.token = None
+        self.wanted = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data["entries"]
+            self.known_hashes = data["known_hashes"]
+        except (OSError, ValueError, KeyError):
+            return
+        self._reindex()
+
+    def _save_cache(self, entries, known_hashes):
+        """Called without the lock held, on a snapshot, so lookups don't wait on the disk."""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries, "known_hashes": known_hashes}, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"[ModelChecker] could not write model inventory: {e}")
+
+    def _reindex(self):
+        by_basename, by_hash, by_stem = {}, {}, {}
+        for key, (_, _, digest) in self.entries.items():
+            category, rel = key.split("|", 1)
+            basename = re.split(r"[\\/]", rel)[-1].lower()
+            if basename not in by_basename:
+                by_stem.setdefault(os.path.splitext(basename)[0], []).append(basename)
+            by_basename.setdefault(basename, []).append((category, rel))
+            if digest:
+                by_hash.setdefault(digest, []).append((category, rel))
+        self.by_basename, self.by_hash, self.by_stem = by_basename, by_hash, by_stem
+
+    def _walk(self):
+        for category, entry in sorted(folder_paths.folder_names_and_paths.items()):
+            extensions = entry[1]
+            if not extensions or MODEL_EXTENSIONS.isdisjoint(extensions):
+                continue
+            seen = set()  # (st_dev, st_ino) of walked directories: symlinks may loop
+            for base in entry[0]:
+                if not os.path.isdir(base):
+                    continue
+                for root, dirs, files in os.walk(base, followlinks=True):
+                    try:
+                        st = os.stat(root)
+                    except OSError:
+                        dirs[:] = []
+                        continue
+                    if (st.st_dev, st.st_ino) in seen:
+                        dirs[:] = []
+                        continue
+                    seen.add((st.st_dev, st.st_ino))
+                    for name in files:
+                        if os.path.splitext(name)[1].lower() in MODEL_EXTENSIONS:
+                            full = os.path.join(root, name)
+                            yield category, os.path.relpath(full, base), full
+
+    def _build(self):
+        while True:
+            with self.lock:
+                token = self.wanted
+                old = dict(self.entries)
+            started = time.time()
+            entries = {}
+            hashed = 0
+            for category, rel, full in self._walk():
+                key = f"{category}|{rel}"
+                if key in entries:
+                    continue
+                try:
+                    st = os.stat(full)
+                    cached = old.get(key)
+                    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                        entries[key] = cached
+                        continue
+                    entries[key] = [st.st_size, st.st_mtime_ns, _partial_hash(full, st.st_size)]
+                    hashed += 1
+                except OSError:
+                    continue
+
+            with self.lock:
+                for key, (_, _, digest) in entries.items():
+                    self.known_hashes[key.split("|", 1)[1]] = digest
+                self.entries = entries
+                self._reindex()
+                self.token = token
+                known_hashes = dict(self.known_hashes)
+            # Only this thread writes the cache file, so it is safe outside the lock
+            self._save_cache(entries, known_hashes)
+            print(f"[ModelChecker] inventory: {len(entries)} model files, "
+                  f"{hashed} hashed, {time.time() - started:.1f}s")
+            with self.lock:
+                if self.wanted == token:
+                    self.thread = None
+                    return
+
+    def refresh(self, token):
+        """Rebuild in the background if the model lists changed since the last build."""
+        with self.lock:
+            self.wanted = token
+            if self.token == token or self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._build, daemon=True,
+                                           name="just_nodes_model_inventory")
+            self.thread.start()
+
+    def suggest(self, name, limit=5):
+        """Existing files that a missing model name most likely refers to."""
+        basename = re.split(r"[\\/]", name)[-1].lower()
+        suggestions = []
+        seen = {name}
+
+        def add(matches, reason):
+            for category, rel in matches:
+                if rel not in seen and len(suggestions) < limit:
+                    seen.add(rel)
+                    suggestions.append({"category": category, "model": rel, "reason": reason})
+
+        with self.lock:
+            digest = self.known_hashes.get(name)
+            if digest:
+                add(self.by_hash.get(digest, []), "same file")
+            add(self.by_basename.get(basename, []), "same name")
+            stem = os.path.splitext(basename)[0]
+            for close in difflib.get_close_matches(stem, list(self.by_stem), n=limit, cutoff=0.6):
+                for other in self.by_stem[close]:
+                    add(self.by_basename[other], "similar name")
+        return suggestions
+
+
+_MODEL_INVENTORY = None
+_MODEL_INVENTORY_LOCK = threading.Lock()
+
+
+def _model_inventory():
+    global _MODEL_INVENTORY
+    with _MODEL_INVENTORY_LOCK:
+        if _MODEL_INVENTORY is None:
+            _MODEL_INVENTORY = _ModelInventory(os.path.join(CACHE_DIR, "model_inventory.json"))
+    return _MODEL_INVENTORY
+
+
 class ModelChecker:
     @classmethod
     def INPUT_TYPES(cls):
@@ -401,12 +1387,141 @@ class ModelChecker:
         return {}
 
 
+class _LoraNameIndex:
+    """Sorted basename and relative-path keys for resolving <lora:name> tags.
+
+    Keeps the original rule (first file in list order whose basename or path
+    starts with the name) but finds candidates with bisect instead of a scan.
+    """
+
+    def __init__(self, files):
+        self.files = files
+        self.basenames = sorted((Path(f).name, i) for i, f in enumerate(files))
+        self.paths = sorted((f, i) for i, f in enumerate(files))
+        self.exact = {}
+        for i, f in enumerate(files):
+            name = Path(f).name
+            for key in (f, os.path.splitext(f)[0], name, os.path.splitext(name)[0]):
+                self.exact.setdefault(key, i)
+
+    @staticmethod
+    def _first_with_prefix(keys, prefix):
+        best = None
+        for key, i in itertools.islice(keys, bisect.bisect_left(keys, (prefix,)), None):
+            if not key.startswith(prefix):
+                break
+            if best is None or i < best:
+                best = i
+        return best
+
+    def resolve(self, name, exact_first=False):
+        if exact_first and name in self.exact:
+            return self.files[self.exact[name]]
+        hits = [i for i in (self._first_with_prefix(self.basenames, name),
+                            self._first_with_prefix(self.paths, name)) if i is not None]
+        return self.files[min(hits)] if hits else None
+
+
+_LORA_NAME_INDEX = None
+
+
+def _lora_name_index():
+    """Name index over the current LoRA list, rebuilt only when the list changes."""
+    global _LORA_NAME_INDEX
+    files = folder_paths.get_filename_list("loras")
+    index = _LORA_NAME_INDEX
+    if index is None or index.files != files:
+        index = _LORA_NAME_INDEX = _LoraNameIndex(files)
+    return index
+
+
+_LORA_POOL = None
+_LORA_POOL_LOCK = threading.Lock()
+
+
+def _lora_pool():
+    """Shared thread pool for reading LoRA files ahead of applying them."""
+    global _LORA_POOL
+    with _LORA_POOL_LOCK:
+        if _LORA_POOL is None:
+            _LORA_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="just_nodes_lora")
+    return _LORA_POOL
+
+
+class _LoraStateCache(_StampedCache):
+    """Process-wide cache of LoRA state dicts shared by every LoraTagModelOnly
+    instance, prefetched on the LoRA pool."""
+
+    def __init__(self, max_bytes, on_evict=None):
+        super().__init__(max_bytes, _lora_pool, on_evict)
+
+    def _load_value(self, path):
+        start = time.perf_counter()
+        lora = comfy.utils.load_torch_file(path, safe_load=True)
+        nbytes = sum(t.numel() * t.element_size() for t in lora.values()
+                     if isinstance(t, torch.Tensor))
+        print(f"[LoraTagModelOnly] loaded {os.path.basename(path)} "
+              f"({nbytes >> 20} MB) in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return lora, nbytes
+
+
+class _PatchedModelCache:
+    """Recently LoRA-patched models, keyed by the input model's id and the
+    ordered ((path, mtime_ns, size, strength), ...) it was patched with.
+
+    A patched model holds on to its LoRA state dicts, so an entry is only kept
+    while all of its files are in _LORA_CACHE and is dropped when one of them
+    is evicted; the LoRA cache budget stays a real bound on LoRA memory.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (input model weakref, patched model)
+        self.lock = threading.Lock()
+
+    def get(self, model, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0]() is not model:
+                # id() was reused by a different model object
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, model, key, patched):
+        try:
+            ref = weakref.ref(model)
+        except TypeError:
+            return
+        with self.lock:
+            # Checked under our lock: an eviction after this calls forget(),
+            # which waits for the lock and then drops the entry again.
+            if not all(_LORA_CACHE.contains(path, (mtime_ns, size))
+                       for path, mtime_ns, size, _ in key[1]):
+                return
+            self.entries[key] = (ref, patched)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def forget(self, path):
+        with self.lock:
+            for key in [k for k in self.entries if any(p == path for p, _, _, _ in k[1])]:
+                del self.entries[key]
+
+
+_PATCHED_MODELS = _PatchedModelCache(4)
+
+# One budget for the whole process, so nodes can't resize the shared cache under each other
+_LORA_CACHE_MB = max(0, _env_int("JUST_NODES_LORA_CACHE_MB", 2048))
+_LORA_CACHE = _LoraStateCache(_LORA_CACHE_MB << 20, on_evict=_PATCHED_MODELS.forget)
+
+
 class LoraTagModelOnly:
     TAG_PATTERN = r"\<[0-9a-zA-Z\:\_\-\.\s\/\(\)\\\\]+\>"
 
-    def __init__(self):
-        self.loaded_loras = {}
-
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -414,6 +1529,9 @@ class LoraTagModelOnly:
                 "model": ("MODEL",),
                 "text": ("STRING", {"multiline": True}),
             },
+            "optional": {
+                "exact_match_first": ("BOOLEAN", {"default": False}),
+            },
         }
 
     RETURN_TYPES = ("MODEL",)
@@ -421,16 +1539,11 @@ class LoraTagModelOnly:
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, model, text):
-        founds = re.findall(self.TAG_PATTERN, text)
-        if not founds:
-            return (model,)
-
-        model_lora = model
-        lora_files = folder_paths.get_filename_list("loras")
-        used_paths = set()
-
-        for f in founds:
+    def _resolve_tags(self, text, exact_match_first):
+        """Resolved (name, lora_name, lora_path, strength) for each lora tag, in order."""
+        lora_index = _lora_name_index()
+        resolved = []
+        for f in re.findall(self.TAG_PATTERN, text):
             tag = f[1:-1]
             pak = tag.split(":")
             if pak[0] != "lora":
@@ -446,11 +1559,7 @@ class LoraTagModelOnly:
             except ValueError:
                 continue
 
-            lora_name = None
-            for lora_file in lora_files:
-                if Path(lora_file).name.startswith(name) or lora_file.startswith(name):
-                    lora_name = lora_file
-                    break
+            lora_name = lora_index.resolve(name, exact_match_first)
 
             if lora_name is None:
                 print(f"[LoraTagModelOnly] not found: <lora:{name}:{strength}>")
@@ -459,22 +1568,43 @@ class LoraTagModelOnly:
             lora_path = folder_paths.get_full_path("loras", lora_name)
             if lora_path is None:
                 continue
+            resolved.append((name, lora_name, lora_path, strength))
+        return resolved
+
+    def execute(self, model, text, exact_match_first=False):
+        resolved = self._resolve_tags(text, exact_match_first)
+        if not resolved:
+            return (model,)
 
-            used_paths.add(lora_path)
+        # Prompts that differ only outside their lora tags reuse the patched model.
+        stamps = []
+        for _, _, lora_path, strength in resolved:
+            st = os.stat(lora_path)
+            stamps.append((lora_path, st.st_mtime_ns, st.st_size, strength))
+        key = (id(model), tuple(stamps))
+        model_lora = _PATCHED_MODELS.get(model, key)
+        if model_lora is not None:
+            print(f"[LoraTagModelOnly] reusing patched model for {len(resolved)} LoRA(s)")
+            return (model_lora,)
+
+        # Read every file that isn't cached yet in parallel while the first
+        # ones are applied.
+        _LORA_CACHE.prefetch(dict.fromkeys(p for _, _, p, _ in resolved))
+
+        model_lora = model
+        for name, lora_name, lora_path, strength in resolved:
             print(f"[LoraTagModelOnly] applying: <lora:{name}:{strength}> -> {lora_name}")
 
-            if lora_path in self.loaded_loras:
-                lora = self.loaded_loras[lora_path]
-            else:
-                lora = comfy.utils.load_torch_file(lora_path, safe_load=True)
-                self.loaded_loras[lora_path] = lora
+            lora = _LORA_CACHE.get(lora_path)
 
             model_lora, _ = comfy.sd.load_lora_for_models(
                 model_lora, None, lora, strength, 0
             )
 
-        for k in [k for k in self.loaded_loras if k not in used_paths]:
-            del self.loaded_loras[k]
+        _PATCHED_MODELS.put(model, key, model_lora)
+        stats = _LORA_CACHE.stats()
+        print(f"[LoraTagModelOnly] cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['entries']} files, {stats['bytes'] >> 20}/{stats['max_bytes'] >> 20} MB")
 
         return (model_lora,)
 
@@ -501,182 +1631,715 @@ class BatchStepper:
         return (step,)
 
 
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_template(text):
+    """Split a template into (literal, placeholder name or None) segments."""
+    segments = []
+    pos = 0
+    for m in _PLACEHOLDER.finditer(text):
+        segments.append((text[pos:m.start()], m.group(1)))
+        pos = m.end()
+    if pos < len(text):
+        segments.append((text[pos:], None))
+    return tuple(segments)
+
+
+def _render_template(text, values, depth=0):
+    """Substitute {NAME} placeholders from values in a single pass.
+
+    Unknown placeholders are kept as written. Substituted values are inserted
+    literally; with depth > 0, placeholders inside them are expanded as well,
+    up to depth levels deep.
+    """
+    parts = []
+    for literal, name in _compile_template(text):
+        parts.append(literal)
+        if name is None:
+            continue
+        if name not in values:
+            parts.append("{" + name + "}")
+            continue
+        value = values[name]
+        if depth > 0 and "{" in value:
+            value = _render_template(value, values, depth - 1)
+        parts.append(value)
+    return "".join(parts)
+
+
+_FILE_CACHE = OrderedDict()  # (path, parser) -> ((size, mtime_ns), parsed data)
+_FILE_CACHE_LOCK = threading.Lock()
+# Enough for presets.json, lists.json and the presets.d/lists.d files in use,
+# without keeping a whole library resident after stepping through it.
+_FILE_CACHE_SIZE = 64
+
+
+def _file_version(path):
+    """(size, mtime_ns) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _load_cached(path, parse):
+    """Parse a file once with parse(f) and reuse it until its size or mtime changes.
+
+    The returned object is shared between callers and must not be mutated.
+    """
+    version = _file_version(path)
+    if version is None:
+        raise FileNotFoundError(f"File not found: '{path}'")
+    key = (path, parse)
+    with _FILE_CACHE_LOCK:
+        cached = _FILE_CACHE.get(key)
+        if cached is not None and cached[0] == version:
+            _FILE_CACHE.move_to_end(key)
+            return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        data = parse(f)
+    with _FILE_CACHE_LOCK:
+        _FILE_CACHE[key] = (version, data)
+        _FILE_CACHE.move_to_end(key)
+        while len(_FILE_CACHE) > _FILE_CACHE_SIZE:
+            _FILE_CACHE.popitem(last=False)
+    return data
+
+
+def _load_json(path):
+    return _load_cached(path, json.load)
+
+
+def _read_lines(f):
+    return [ln.strip() for ln in f if ln.strip()]
+
+
+PRESETS_FILE = os.path.join(PRESETS_DIR, "presets.json")
+LISTS_FILE = os.path.join(PRESETS_DIR, "lists.json")
+PRESETS_D = os.path.join(PRESETS_DIR, "presets.d")
+LISTS_D = os.path.join(PRESETS_DIR, "lists.d")
+
+
+class _PresetIndex:
+    """Preset name -> defining file, over presets.json and presets.d/*.json.
+
+    Each file's preset names are remembered with its size/mtime (persisted
+    under cache/), so refreshing only parses new or edited files, and running
+    a preset loads just the file that defines it. presets.d is only listed
+    again when its own mtime changes (files added, removed or replaced); a
+    forced refresh also picks up files edited in place.
+    """
+
+    RACY_NS = _FolderIndex.RACY_NS
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.files = None  # path -> (version, names)
+        self.key = None
+        self.names = []
+        self.where = {}
+        self.dir_scan = (None, [])  # (presets.d (mtime_ns, ino), [(path, version)])
+        self.lock = threading.Lock()
+
+    def _scan_dir(self, force):
+        try:
+            st = os.stat(PRESETS_D)
+        except OSError:
+            return []
+        dir_version = (st.st_mtime_ns, st.st_ino)
+        cached_version, cached = self.dir_scan
+        # An mtime this recent may still change within its timestamp granularity
+        if (not force and dir_version == cached_version
+                and time.time_ns() - st.st_mtime_ns >= self.RACY_NS):
+            return cached
+        try:
+            with os.scandir(PRESETS_D) as it:
+                paths = sorted(e.path for e in it if e.name.endswith(".json") and e.is_file())
+        except OSError:
+            paths = []
+        found = []
+        for path in paths:
+            version = _file_version(path)
+            if version is not None:
+                found.append((path, version))
+        self.dir_scan = (dir_version, found)
+        return found
+
+    def _scan(self, force=False):
+        found = []
+        version = _file_version(PRESETS_FILE)
+        if version is not None:
+            found.append((PRESETS_FILE, version))
+        found.extend(self._scan_dir(force))
+        return found
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return {path: (tuple(version), names) for path, (version, names) in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.files, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"[PresetManager] could not write preset index: {e}")
+
+    def refresh(self, force=False):
+        found = self._scan(force)
+        key = tuple(found)
+        with self.lock:
+            if key == self.key:
+                return
+            if self.files is None:
+                self.files = self._load_cache()
+
+            files = {}
+            for path, version in found:
+                cached = self.files.get(path)
+                if cached is not None and cached[0] == version:
+                    files[path] = cached
+                elif path == PRESETS_FILE:
+                    # Errors in presets.json propagate, as they always have
+                    files[path] = (version, list(_load_json(path).keys()))
+                else:
+                    # Parsed without caching: only the selected preset's file stays in memory
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            files[path] = (version, list(json.load(f).keys()))
+                    except (OSError, ValueError, AttributeError) as e:
+                        print(f"[PresetManager] skipping {path}: {e}")
+
+            names, where = [], {}
+            for path, _ in found:
+                for name in files.get(path, (None, []))[1]:
+                    if name not in where:
+                        where[name] = path
+                        names.append(name)
+
+            changed = files != self.files
+            self.files, self.names, self.where, self.key = files, names, where, key
+            if changed:
+                self._save_cache()
+
+
+_PRESET_INDEX = _PresetIndex(os.path.join(CACHE_DIR, "preset_index.json"))
+
+
+def _preset_names():
+    """Preset names: presets.json order, then presets.d files in name order."""
+    _PRESET_INDEX.refresh()
+    return _PRESET_INDEX.names
+
+
+def _preset_names_version(force=False):
+    """Preset names plus the ((path, (size, mtime_ns)), ...) key they were built from."""
+    _PRESET_INDEX.refresh(force)
+    with _PRESET_INDEX.lock:
+        return _PRESET_INDEX.names, _PRESET_INDEX.key
+
+
 def _load_preset_names():
-    """Load preset names from presets.json for the dropdown."""
-    presets_file = os.path.join(PRESETS_DIR, "presets.json")
-    if not os.path.isfile(presets_file):
+    """Load preset names for the dropdown."""
+    if not os.path.isfile(PRESETS_FILE) and not os.path.isdir(PRESETS_D):
         return ["NO PRESETS FOUND"]
     try:
-        with open(presets_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return list(data.keys()) if data else ["EMPTY"]
+        return list(_preset_names()) or ["EMPTY"]
     except Exception:
         return ["ERROR LOADING PRESETS"]
 
 
+def _select_preset(preset, preset_index=-1):
+    """Resolve the preset to use, preset_index winning over the name when >= 0.
+
+    Returns (name, config, error) where error is the message to output instead.
+    """
+    preset_names = _preset_names()
+
+    # If preset_index is >= 0, use it instead of the dropdown
+    if preset_index >= 0:
+        if preset_index < len(preset_names):
+            preset = preset_names[preset_index]
+        else:
+            return preset, None, f"ERROR: preset_index {preset_index} out of range (max {len(preset_names) - 1})"
+
+    path = _PRESET_INDEX.where.get(preset)
+    config = _load_json(path).get(preset) if path else None
+    if config is None:
+        return preset, None, "ERROR: Preset not found"
+
+    return preset, config, None
+
+
+def _list_source(name):
+    """File holding the list for a variable: lists.d/NAME.json or .txt, else lists.json."""
+    if name and "/" not in name and os.sep not in name and not name.startswith("."):
+        for ext in (".json", ".txt"):
+            path = os.path.join(LISTS_D, name + ext)
+            if os.path.isfile(path):
+                return path
+    return LISTS_FILE
+
+
+def _get_list(name):
+    path = _list_source(name)
+    try:
+        if path == LISTS_FILE:
+            return _load_json(path).get(name)
+        if path.endswith(".txt"):
+            return _load_cached(path, _read_lines)
+        return _load_json(path)
+    except FileNotFoundError:
+        return None
+
+
+def _random_vars(config):
+    return [name for name, cfg in config.items()
+            if isinstance(cfg, dict) and not name.startswith("_") and cfg.get("mode", "random") != "manual"]
+
+
+def _preset_fingerprint(preset, preset_index, *inputs):
+    """Hash of everything a preset expansion depends on, or NaN if unreadable."""
+    try:
+        name, config, _ = _select_preset(preset, -1 if preset_index is None else preset_index)
+        list_versions = []
+        if config is not None:
+            list_versions = [(var, _file_version(_list_source(var))) for var in _random_vars(config)]
+    except Exception:
+        return float("nan")
+    fingerprint = json.dumps([name, config, list_versions, *inputs], sort_keys=True, default=str)
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def _expand_preset(preset_config, lists, seed, prompt_template, negative_template="",
+                   extra_text_override="", system_prompt_override=""):
+    """Resolve a preset for one seed into the six PresetManager outputs."""
+    rng = random.Random(seed)
+    values = {}
+    extra_text_from_preset = ""
+    template_from_preset = ""
+    negative_from_preset = ""
+    system_prompt_from_preset = ""
+    pool_from_preset = None
+    output_path = ""
+    output_prefix = ""
+    expand_depth = 0
+
+    for var_name, var_config in preset_config.items():
+        if var_name == "_extra_text":
+            extra_text_from_preset = var_config if isinstance(var_config, str) else str(var_config)
+            continue
+        if var_name == "_template":
+            template_from_preset = var_config if isinstance(var_config, str) else str(var_config)
+            continue
+        if var_name == "_negative":
+            negative_from_preset = var_config if isinstance(var_config, str) else str(var_config)
+            continue
+        if var_name == "_system_prompt":
+            system_prompt_from_preset = var_config if isinstance(var_config, str) else str(var_config)
+            continue
+        if var_name == "_pool":
+            pool_from_preset = var_config if isinstance(var_config, list) else None
+            continue
+        if var_name == "_output_path":
+            output_path = var_config if isinstance(var_config, str) else str(var_config)
+            continue
+        if var_name == "_output_prefix":
+            output_prefix = var_config if isinstance(var_config, str) else str(var_config)
+            continue
+        if var_name == "_expand_depth":
+            expand_depth = var_config if isinstance(var_config, int) else 0
+            continue
+
+        mode = var_config.get("mode", "random")
+
+        if mode == "manual":
+            values[var_name] = str(var_config.get("value", ""))
+        else:
+            # Random: pick from the list
+            choices = lists.get(var_name)
+            if choices:
+                values[var_name] = str(rng.choice(choices))
+            else:
+                values[var_name] = ""
+
+    # If _pool exists, pick one entry by seed (synchronized positive/negative/extra_text/system_prompt)
+    pool_positive = ""
+    pool_negative = ""
+    pool_extra_text = ""
+    pool_system_prompt = ""
+    if pool_from_preset and len(pool_from_preset) > 0:
+        pool_idx = seed % len(pool_from_preset)
+        selected = pool_from_preset[pool_idx]
+        if isinstance(selected, dict):
+            pool_positive = str(selected.get("positive", ""))
+            pool_negative = str(selected.get("negative", ""))
+            pool_extra_text = str(selected.get("extra_text", ""))
+            pool_system_prompt = str(selected.get("system_prompt", ""))
+
+    # Resolve POSITIVE: input > pool > preset _template > error
+    if prompt_template.strip():
+        result = prompt_template
+    elif pool_positive:
+        result = pool_positive
+    elif template_from_preset:
+        result = template_from_preset
+    else:
+        return ("ERROR: No template provided and no _template/_pool in preset", "", "", "", "", "")
+
+    # Resolve NEGATIVE: input > pool > preset _negative > empty
+    if negative_template.strip():
+        negative = negative_template
+    elif pool_negative:
+        negative = pool_negative
+    else:
+        negative = negative_from_preset
+
+    # Resolve EXTRA_TEXT: input override > pool > preset _extra_text > empty
+    if extra_text_override.strip():
+        extra_text = extra_text_override
+    elif pool_extra_text:
+        extra_text = pool_extra_text
+    else:
+        extra_text = extra_text_from_preset
+
+    # Resolve SYSTEM_PROMPT: input override > pool > preset _system_prompt > empty
+    if system_prompt_override.strip():
+        system_prompt = system_prompt_override
+    elif pool_system_prompt:
+        system_prompt = pool_system_prompt
+    else:
+        system_prompt = system_prompt_from_preset
+
+    # Replace {VARIABLES} in all resolved fields (template substitution)
+    result = _render_template(result, values, expand_depth)
+    extra_text = _render_template(extra_text, values, expand_depth)
+    negative = _render_template(negative, values, expand_depth)
+    system_prompt = _render_template(system_prompt, values, expand_depth)
+
+    return (result, extra_text, output_path, output_prefix, negative, system_prompt,)
+
+
+PRESET_OUTPUTS = ("prompt", "extra_text", "output_path", "output_prefix", "negative", "system_prompt",)
+
+
+def _expand_preset_seeds(preset, seeds, prompt_template="", preset_index=-1,
+                         negative_template="", extra_text_override="", system_prompt_override=""):
+    """Expand a preset for many seeds, loading the preset and lists only once.
+
+    Returns (list of output tuples, error); error is set when the preset can't be resolved.
+    """
+    _, config, error = _select_preset(preset, preset_index)
+    if error:
+        return [], error
+    # Only the lists this preset draws from are loaded
+    lists = {name: _get_list(name) for name in _random_vars(config)}
+    return [
+        _expand_preset(config, lists, seed, prompt_template, negative_template,
+                       extra_text_override, system_prompt_override)
+        for seed in seeds
+    ], None
+
+
+def _preset_inputs():
+    return {
+        "preset": (_load_preset_names(),),
+        "seed": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF}),
+        "prompt_template": ("STRING", {
+            "multiline": True,
+            "default": "A beautiful {COLOR} {TYPE} flower, {SIZE} size, in a garden."
+        }),
+    }
+
+
+def _preset_optional_inputs():
+    return {
+        "preset_index": ("INT", {"default": -1, "min": -1, "max": 999}),
+        "negative_template": ("STRING", {
+            "multiline": True,
+            "default": ""
+        }),
+        "extra_text_override": ("STRING", {
+            "multiline": True,
+            "default": ""
+        }),
+        "system_prompt_override": ("STRING", {
+            "multiline": True,
+            "default": ""
+        }),
+    }
+
+
 class PresetManager:
     @classmethod
     def INPUT_TYPES(cls):
         return {
-            "required": {
-                "preset": (_load_preset_names(),),
-                "seed": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF}),
-                "prompt_template": ("STRING", {
-                    "multiline": True,
-                    "default": "A beautiful {COLOR} {TYPE} flower, {SIZE} size, in a garden."
-                }),
-            },
-            "optional": {
-                "preset_index": ("INT", {"default": -1, "min": -1, "max": 999}),
-                "negative_template": ("STRING", {
-                    "multiline": True,
-                    "default": ""
-                }),
-                "extra_text_override": ("STRING", {
-                    "multiline": True,
-                    "default": ""
-                }),
-                "system_prompt_override": ("STRING", {
-                    "multiline": True,
-                    "default": ""
-                }),
-            },
+            "required": _preset_inputs(),
+            "optional": _preset_optional_inputs(),
         }
 
     RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "STRING",)
-    RETURN_NAMES = ("prompt", "extra_text", "output_path", "output_prefix", "negative", "system_prompt",)
+    RETURN_NAMES = PRESET_OUTPUTS
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        return float("nan")
+    def IS_CHANGED(cls, preset=None, seed=0, prompt_template="", preset_index=-1,
+                   negative_template="", extra_text_override="", system_prompt_override="",
+                   **kwargs):
+        # Output is a pure function of the preset entry, the lists and the inputs
+        # (random picks are seeded), so fingerprint those to let ComfyUI cache.
+        return _preset_fingerprint(preset, preset_index, seed, prompt_template, negative_template,
+                                   extra_text_override, system_prompt_override)
 
     def execute(self, preset, seed, prompt_template, preset_index=-1,
                 negative_template="", extra_text_override="", system_prompt_override=""):
-        # Load presets and lists
-        presets_file = os.path.join(PRESETS_DIR, "presets.json")
-        lists_file = os.path.join(PRESETS_DIR, "lists.json")
+        outputs, error = _expand_preset_seeds(preset, [seed], prompt_template, preset_index,
+                                              negative_template, extra_text_override,
+                                              system_prompt_override)
+        if error:
+            return (error, "", "", "", "", "")
+        return outputs[0]
 
-        with open(presets_file, "r", encoding="utf-8") as f:
-            presets = json.load(f)
 
-        with open(lists_file, "r", encoding="utf-8") as f:
-            lists = json.load(f)
+class PresetBatch:
+    @classmethod
+    def INPUT_TYPES(cls):
+        inputs = _preset_inputs()
+        inputs["count"] = ("INT", {"default": 4, "min": 1, "max": 4096})
+        return {
+            "required": inputs,
+            "optional": _preset_optional_inputs(),
+        }
 
-        # If preset_index is >= 0, use it instead of the dropdown
-        if preset_index >= 0:
-            preset_names = list(presets.keys())
-            if preset_index < len(preset_names):
-                preset = preset_names[preset_index]
-            else:
-                return (f"ERROR: preset_index {preset_index} out of range (max {len(preset_names) - 1})", "", "", "", "", "")
+    RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "STRING",)
+    RETURN_NAMES = PRESET_OUTPUTS
+    OUTPUT_IS_LIST = (True, True, True, True, True, True,)
+    FUNCTION = "execute"
+    CATEGORY = "\U0001f48e Just Nodes"
 
-        if preset not in presets:
-            return ("ERROR: Preset not found", "", "", "", "", "")
+    @classmethod
+    def IS_CHANGED(cls, preset=None, seed=0, prompt_template="", count=1, preset_index=-1,
+                   negative_template="", extra_text_override="", system_prompt_override="",
+                   **kwargs):
+        return _preset_fingerprint(preset, preset_index, seed, count, prompt_template,
+                                   negative_template, extra_text_override, system_prompt_override)
 
-        preset_config = presets[preset]
-        rng = random.Random(seed)
-        values = {}
-        extra_text_from_preset = ""
-        template_from_preset = ""
-        negative_from_preset = ""
-        system_prompt_from_preset = ""
-        pool_from_preset = None
-        output_path = ""
-        output_prefix = ""
-
-        for var_name, var_config in preset_config.items():
-            if var_name == "_extra_text":
-                extra_text_from_preset = var_config if isinstance(var_config, str) else str(var_config)
-                continue
-            if var_name == "_template":
-                template_from_preset = var_config if isinstance(var_config, str) else str(var_config)
-                continue
-            if var_name == "_negative":
-                negative_from_preset = var_config if isinstance(var_config, str) else str(var_config)
-                continue
-            if var_name == "_system_prompt":
-                system_prompt_from_preset = var_config if isinstance(var_config, str) else str(var_config)
-                continue
-            if var_name == "_pool":
-                pool_from_preset = var_config if isinstance(var_config, list) else None
-                continue
-            if var_name == "_output_path":
-                output_path = var_config if isinstance(var_config, str) else str(var_config)
-                continue
-            if var_name == "_output_prefix":
-                output_prefix = var_config if isinstance(var_config, str) else str(var_config)
+    def execute(self, preset, seed, prompt_template, count, preset_index=-1,
+                negative_template="", extra_text_override="", system_prompt_override=""):
+        outputs, error = _expand_preset_seeds(preset, range(seed, seed + count), prompt_template,
+                                              preset_index, negative_template,
+                                              extra_text_override, system_prompt_override)
+        if error:
+            return ([error], [""], [""], [""], [""], [""])
+        return tuple(list(column) for column in zip(*outputs))
+
+
+def _scan_counter(path, prefix, delimiter, padding, extension):
+    """Max existing number + 1 for the pattern, or 1 when there is none."""
+    # Same naming scheme as WAS Save Text File so both stay in sync.
+    pattern = re.compile(f"^{re.escape(prefix)}{re.escape(delimiter)}"
+                         f"(\\d{{{padding}}}){re.escape('.' + extension)}$")
+    top = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            m = pattern.match(entry.name)
+            if m:
+                top = max(top, int(m.group(1)))
+    return top + 1
+
+
+_COUNTERS = {}  # directory -> [(inode, mtime_ns) after our last claim, {pattern: next number}]
+_COUNTERS_LOCK = threading.Lock()
+
+
+def _reserve_filename(path, prefix, delimiter, padding, extension):
+    """Claim the next free numbered filename in path.
+
+    Counters are kept in memory per directory, together with the directory's
+    inode/mtime as of our last claim. When the directory changed in between
+    (files added, renamed or deleted by anyone else) its counters are dropped
+    and rescanned, so numbering stays max existing + 1 as with a scan per save,
+    in sync with WAS Save Text File. A number is claimed by creating the file
+    with O_EXCL, so other threads or processes saving into the same folder can
+    never get the same name; the caller overwrites it.
+    """
+    folder = os.path.abspath(path)
+    pattern = (prefix, delimiter, padding, extension)
+    with _COUNTERS_LOCK:
+        st = os.stat(folder)
+        entry = _COUNTERS.get(folder)
+        if entry is None or entry[0] != (st.st_ino, st.st_mtime_ns):
+            entry = [None, {}]
+            _COUNTERS[folder] = entry
+        counters = entry[1]
+        if pattern not in counters:
+            counters[pattern] = _scan_counter(folder, prefix, delimiter, padding, extension)
+
+        collisions = 0
+        while True:
+            num = str(counters[pattern]).zfill(padding)
+            counters[pattern] += 1
+            filename = f"{prefix}{delimiter}{num}.{extension}"
+            try:
+                fd = os.open(os.path.join(folder, filename), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Another writer is ahead of us: catch up instead of probing one by one
+                collisions += 1
+                if collisions >= 32:
+                    counters[pattern] = max(counters[pattern], _scan_counter(
+                        folder, prefix, delimiter, padding, extension))
+                    collisions = 0
                 continue
-
-            mode = var_config.get("mode", "random")
-
-            if mode == "manual":
-                values[var_name] = var_config.get("value", "")
-            else:
-                # Random: pick from the list
-                if var_name in lists and lists[var_name]:
-                    values[var_name] = rng.choice(lists[var_name])
-                else:
-                    values[var_name] = ""
-
-        # If _pool exists, pick one entry by seed (synchronized positive/negative/extra_text/system_prompt)
-        pool_positive = ""
-        pool_negative = ""
-        pool_extra_text = ""
-        pool_system_prompt = ""
-        if pool_from_preset and len(pool_from_preset) > 0:
-            pool_idx = seed % len(pool_from_preset)
-            selected = pool_from_preset[pool_idx]
-            if isinstance(selected, dict):
-                pool_positive = str(selected.get("positive", ""))
-                pool_negative = str(selected.get("negative", ""))
-                pool_extra_text = str(selected.get("extra_text", ""))
-                pool_system_prompt = str(selected.get("system_prompt", ""))
-
-        # Resolve POSITIVE: input > pool > preset _template > error
-        if prompt_template.strip():
-            result = prompt_template
-        elif pool_positive:
-            result = pool_positive
-        elif template_from_preset:
-            result = template_from_preset
-        else:
-            return ("ERROR: No template provided and no _template/_pool in preset", "", "", "", "", "")
-
-        # Resolve NEGATIVE: input > pool > preset _negative > empty
-        if negative_template.strip():
-            negative = negative_template
-        elif pool_negative:
-            negative = pool_negative
-        else:
-            negative = negative_from_preset
-
-        # Resolve EXTRA_TEXT: input override > pool > preset _extra_text > empty
-        if extra_text_override.strip():
-            extra_text = extra_text_override
-        elif pool_extra_text:
-            extra_text = pool_extra_text
-        else:
-            extra_text = extra_text_from_preset
-
-        # Resolve SYSTEM_PROMPT: input override > pool > preset _system_prompt > empty
-        if system_prompt_override.strip():
-            system_prompt = system_prompt_override
-        elif pool_system_prompt:
-            system_prompt = pool_system_prompt
-        else:
-            system_prompt = system_prompt_from_preset
-
-        # Replace {VARIABLES} in all resolved fields (template substitution)
-        for var_name, var_value in values.items():
-            placeholder = f"{{{var_name}}}"
-            result = result.replace(placeholder, var_value)
-            extra_text = extra_text.replace(placeholder, var_value)
-            negative = negative.replace(placeholder, var_value)
-            system_prompt = system_prompt.replace(placeholder, var_value)
-
-        return (result, extra_text, output_path, output_prefix, negative, system_prompt,)
+            os.close(fd)
+            # Our own claim changed the directory: remember its state so only
+            # changes made by others trigger a rescan.
+            st = os.stat(folder)
+            entry[0] = (st.st_ino, st.st_mtime_ns)
+            return filename
+
+
+# Host RAM (MB) SaveImageWithText may keep page-locked for GPU-to-host copies.
+# Off by default: the buffer stays allocated for the life of the process.
+_PINNED_SAVE_MB = max(0, _env_int("JUST_NODES_PINNED_SAVE_MB", 0))
+_PINNED_BUFFER = None
+
+
+def _to_uint8(images, reuse_pinned=False):
+    """Convert a [N,H,W,C] float batch to a uint8 numpy array.
+
+    Clamping, scaling and the cast happen on the tensor's own device for the
+    whole batch, followed by a single device-to-host copy. With reuse_pinned
+    and JUST_NODES_PINNED_SAVE_MB set, a CUDA batch that fits is copied through
+    one pinned host buffer kept between calls (page-locked allocation is
+    expensive); the result is then only valid until the next call, so it must
+    not be handed to background writers.
+    """
+    global _PINNED_BUFFER
+    u8 = images.mul(255).clamp_(0, 255).to(torch.uint8)
+    if u8.device.type == "cpu":
+        return u8.numpy()
+    if reuse_pinned and u8.device.type == "cuda" and u8.numel() <= _PINNED_SAVE_MB << 20:
+        if _PINNED_BUFFER is None or _PINNED_BUFFER.numel() < u8.numel():
+            _PINNED_BUFFER = torch.empty(u8.numel(), dtype=torch.uint8, pin_memory=True)
+        out = _PINNED_BUFFER[:u8.numel()].view(u8.shape)
+        out.copy_(u8)
+        return out.numpy()
+    return u8.cpu().numpy()
+
+
+def _write_image(img_np, filepath, extension, save_kwargs, text):
+    """Encode one image and write it, plus the .txt companion if text is given."""
+    try:
+        pil_img = Image.fromarray(img_np)
+        if extension == "jpg":
+            pil_img = pil_img.convert("RGB")
+
+        pil_img.save(filepath, **save_kwargs)
+    except BaseException:
+        # Don't leave the reserved (empty or partial) file behind
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+        raise
+
+    # For jpg/webp, embed text as companion .txt file
+    if extension != "png" and text:
+        txt_path = os.path.splitext(filepath)[0] + ".txt"
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+class _BackgroundWriter:
+    """Thread pool that encodes and writes images off the execution thread.
+
+    submit() blocks once max_pending writes are queued, so a sampler that is
+    faster than the encoder can't pile up unbounded batches in memory.
+    """
+
+    def __init__(self, workers, max_pending):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="just_nodes_save")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.pending = set()
+        self.errors = []
+        self.lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        self.slots.acquire()
+        future = self.pool.submit(fn, *args)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self.slots.release()
+        error = future.exception()
+        with self.lock:
+            self.pending.discard(future)
+            if error is not None:
+                self.errors.append(str(error))
+        if error is not None:
+            print(f"[SaveImageWithText] background save failed: {error}")
+
+    def flush(self, timeout=None):
+        """Wait for queued writes; return (number waited on, errors since last flush)."""
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending, timeout)
+        with self.lock:
+            errors, self.errors = self.errors, []
+        return len(pending), errors
+
+
+_SAVE_WRITER = None
+_SAVE_WRITER_LOCK = threading.Lock()
+
+
+def _save_writer():
+    global _SAVE_WRITER
+    with _SAVE_WRITER_LOCK:
+        if _SAVE_WRITER is None:
+            workers = min(4, os.cpu_count() or 2)
+            _SAVE_WRITER = _BackgroundWriter(workers, workers * 2)
+    return _SAVE_WRITER
+
+
+def _send_preview_when_done(futures, node_id, images, prompt_id, client_id):
+    """Push the node's preview to the UI once all its background writes land.
+
+    prompt_id and client_id must be captured while the node runs: by the time
+    the writes finish the server may already be executing the next prompt.
+    """
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(future):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        if any(f.exception() is not None for f in futures):
+            return
+        from server import PromptServer
+        PromptServer.instance.send_sync("executed", {
+            "node": node_id,
+            "display_node": node_id,
+            "output": {"images": images},
+            "prompt_id": prompt_id,
+        }, client_id)
+
+    for future in futures:
+        future.add_done_callback(done)
 
 
 class SaveImageWithText:
@@ -699,10 +2362,15 @@ class SaveImageWithText:
             },
             "optional": {
                 "text": ("STRING", {"forceInput": True}),
+                "async_save": ("BOOLEAN", {"default": False}),
+                "png_compress_level": ("INT", {"default": 6, "min": 0, "max": 9}),
+                "webp_method": ("INT", {"default": 4, "min": 0, "max": 6}),
+                "manifest": ("BOOLEAN", {"default": False}),
             },
             "hidden": {
                 "prompt": "PROMPT",
                 "extra_pnginfo": "EXTRA_PNGINFO",
+                "unique_id": "UNIQUE_ID",
             },
         }
 
@@ -714,79 +2382,90 @@ class SaveImageWithText:
 
     def execute(self, image, path, filename_prefix, filename_delimiter,
                 filename_padding, extension, quality, embed_workflow,
-                show_preview, text=None, prompt=None, extra_pnginfo=None):
+                show_preview, text=None, async_save=False, png_compress_level=6,
+                webp_method=4, manifest=False, prompt=None, extra_pnginfo=None,
+                unique_id=None):
         from PIL.PngImagePlugin import PngInfo
         from datetime import datetime
 
-        import re
-
         # Resolve path
         if not os.path.isabs(path):
             path = os.path.join(folder_paths.get_output_directory(), path)
         os.makedirs(path, exist_ok=True)
 
-        # Find next counter — regex-based, starts at 1 when folder is empty,
-        # takes max existing number + 1 otherwise (syncs with WAS Save Text File).
-        dot_ext = f".{extension}"
-        if filename_delimiter:
-            pattern = f"^{re.escape(filename_prefix)}{re.escape(filename_delimiter)}(\\d{{{filename_padding}}}){re.escape(dot_ext)}$"
-        else:
-            pattern = f"^{re.escape(filename_prefix)}(\\d{{{filename_padding}}}){re.escape(dot_ext)}$"
-        existing_nums = []
-        for f in os.listdir(path):
-            m = re.match(pattern, f)
-            if m:
-                existing_nums.append(int(m.group(1)))
-        counter = max(existing_nums) + 1 if existing_nums else 1
+        # Serialize workflow metadata once for the whole batch
+        prompt_json = None
+        if prompt is not None and (embed_workflow or manifest):
+            prompt_json = json.dumps(prompt)
+        prompt_hash = hashlib.sha1(prompt_json.encode("utf-8")).hexdigest() if prompt_json else None
+        extra_json = {}
+        if embed_workflow and extra_pnginfo is not None:
+            extra_json = {k: json.dumps(v) for k, v in extra_pnginfo.items()}
+
+        save_kwargs = {}
+        if extension == "png":
+            metadata = PngInfo()
+            if text:
+                metadata.add_text("just_text", text)
+            if embed_workflow:
+                if prompt_json is not None:
+                    metadata.add_text("prompt", prompt_json)
+                for k, v in extra_json.items():
+                    metadata.add_text(k, v)
+            save_kwargs["pnginfo"] = metadata
+            save_kwargs["compress_level"] = png_compress_level
+
+        elif extension == "jpg":
+            save_kwargs["quality"] = quality
+
+        elif extension == "webp":
+            save_kwargs["quality"] = quality
+            save_kwargs["lossless"] = quality == 100
+            save_kwargs["method"] = webp_method
+
+        # The manifest replaces per-image .txt companions for jpg/webp
+        companion_text = text if extension != "png" and not manifest else None
 
         results = []
         filepaths = []
+        futures = []
+        manifest_lines = []
+
+        if manifest and embed_workflow and prompt_hash:
+            # The bulky UI workflow is written once per graph; the API prompt
+            # (seeds and widget values) once per distinct prompt, pointing at it.
+            folder = os.path.abspath(path)
+            workflow_hash = _workflow_hash((extra_pnginfo or {}).get("workflow"))
+            if workflow_hash and _manifest_record_new(folder, "workflow", workflow_hash):
+                manifest_lines.append(json.dumps({
+                    "type": "workflow", "workflow_hash": workflow_hash,
+                    "extra_pnginfo": extra_pnginfo,
+                }, ensure_ascii=False))
+            if _manifest_record_new(folder, "prompt", prompt_hash):
+                manifest_lines.append(json.dumps({
+                    "type": "prompt", "prompt_hash": prompt_hash,
+                    "workflow_hash": workflow_hash, "prompt": prompt,
+                }, ensure_ascii=False))
+
+        pixels = _to_uint8(image, reuse_pinned=not async_save)
 
         for i in range(image.shape[0]):
-            img = image[i]
-            img_np = (img.cpu().numpy() * 255).astype(np.uint8)
-            pil_img = Image.fromarray(img_np)
-
-            num = str(counter + i).zfill(filename_padding)
-            filename = f"{filename_prefix}{filename_delimiter}{num}.{extension}"
+            # Max existing number + 1 (1 in an empty folder), see _reserve_filename
+            filename = _reserve_filename(path, filename_prefix, filename_delimiter,
+                                         filename_padding, extension)
             filepath = os.path.join(path, filename)
 
-            # Guard against collisions
-            while os.path.exists(filepath):
-                counter += 1
-                num = str(counter + i).zfill(filename_padding)
-                filename = f"{filename_prefix}{filename_delimiter}{num}.{extension}"
-                filepath = os.path.join(path, filename)
-
-            save_kwargs = {}
-
-            if extension == "png":
-                metadata = PngInfo()
-                if text:
-                    metadata.add_text("just_text", text)
-                if embed_workflow:
-                    if prompt is not None:
-                        metadata.add_text("prompt", json.dumps(prompt))
-                    if extra_pnginfo is not None:
-                        for k, v in extra_pnginfo.items():
-                            metadata.add_text(k, json.dumps(v))
-                save_kwargs["pnginfo"] = metadata
-
-            elif extension == "jpg":
-                save_kwargs["quality"] = quality
-                pil_img = pil_img.convert("RGB")
-
-            elif extension == "webp":
-                save_kwargs["quality"] = quality
-                save_kwargs["lossless"] = quality == 100
-
-            pil_img.save(filepath, **save_kwargs)
-
-            # For jpg/webp, embed text as companion .txt file
-            if extension != "png" and text:
-                txt_path = os.path.splitext(filepath)[0] + ".txt"
-                with open(txt_path, "w", encoding="utf-8") as f:
-                    f.write(text)
+            if manifest:
+                manifest_lines.append(json.dumps({
+                    "type": "image", "file": filename, "text": text or "",
+                    "prompt_hash": prompt_hash,
+                }, ensure_ascii=False))
+
+            if async_save:
+                futures.append(_save_writer().submit(
+                    _write_image, pixels[i], filepath, extension, save_kwargs, companion_text))
+            else:
+                _write_image(pixels[i], filepath, extension, save_kwargs, companion_text)
 
             filepaths.append(filepath)
 
@@ -803,9 +2482,52 @@ class SaveImageWithText:
                     "type": "output",
                 })
 
+        if manifest_lines:
+            _append_manifest(path, manifest_lines)
+
+        # Files written in the background aren't viewable yet: send the preview
+        # once they are instead of returning it with the node result.
+        if futures and results:
+            if unique_id is not None:
+                from server import PromptServer
+                server = PromptServer.instance
+                _send_preview_when_done(futures, unique_id, results,
+                                        getattr(server, "last_prompt_id", None),
+                                        server.client_id)
+            results = []
+
         return {"ui": {"images": results}, "result": (filepaths[0] if filepaths else "",)}
 
 
+_FINGERPRINTS = {}
+_FINGERPRINTS_LOCK = threading.Lock()
+
+
+def _file_fingerprint(path, hash_content=True):
+    """SHA-256 of a file, recomputed only when its size, mtime or inode change.
+
+    With hash_content off the stat stamp itself is the fingerprint.
+    """
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns, st.st_ino)
+    if not hash_content:
+        return "%d-%d-%d" % stamp
+
+    with _FINGERPRINTS_LOCK:
+        cached = _FINGERPRINTS.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    m = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            m.update(block)
+    digest = m.digest().hex()
+    with _FINGERPRINTS_LOCK:
+        _FINGERPRINTS[path] = (stamp, digest)
+    return digest
+
+
 class LoadImageWithText:
     @classmethod
     def INPUT_TYPES(cls):
@@ -818,6 +2540,10 @@ class LoadImageWithText:
             "required": {
                 "image": (files, {"image_upload": True}),
             },
+            "optional": {
+                "disk_cache": ("BOOLEAN", {"default": False}),
+                "hash_content": ("BOOLEAN", {"default": True}),
+            },
         }
 
     RETURN_TYPES = ("IMAGE", "MASK", "STRING",)
@@ -825,23 +2551,16 @@ class LoadImageWithText:
     FUNCTION = "execute"
     CATEGORY = "\U0001f48e Just Nodes"
 
-    def execute(self, image):
+    def execute(self, image, disk_cache=False, hash_content=True):
         image_path = folder_paths.get_annotated_filepath(image)
 
-        pil_img = Image.open(image_path)
-        pil_img = ImageOps.exif_transpose(pil_img)
-
-        # Extract text from PNG metadata
-        text = ""
-        if hasattr(pil_img, "info") and "just_text" in pil_img.info:
-            text = pil_img.info["just_text"]
+        arr, text = _read_image(image_path, disk_cache, alpha=True)
 
-        img = pil_img.convert("RGB")
-        img_np = np.array(img).astype(np.float32) / 255.0
+        img_np = arr[..., :3].astype(np.float32) / 255.0
         img_tensor = torch.from_numpy(img_np)[None,]
 
-        if "A" in pil_img.getbands():
-            mask = np.array(pil_img.getchannel("A")).astype(np.float32) / 255.0
+        if arr.shape[2] == 4:
+            mask = arr[..., 3].astype(np.float32) / 255.0
             mask = 1.0 - torch.from_numpy(mask)
         else:
             mask = torch.zeros((64, 64), dtype=torch.float32)
@@ -849,13 +2568,9 @@ class LoadImageWithText:
         return (img_tensor, mask.unsqueeze(0), text,)
 
     @classmethod
-    def IS_CHANGED(cls, image):
+    def IS_CHANGED(cls, image, hash_content=True, **kwargs):
         image_path = folder_paths.get_annotated_filepath(image)
-        import hashlib
-        m = hashlib.sha256()
-        with open(image_path, "rb") as f:
-            m.update(f.read())
-        return m.digest().hex()
+        return _file_fingerprint(image_path, hash_content)
 
     @classmethod
     def VALIDATE_INPUTS(cls, image):